@@ -1,8 +1,8 @@
 import pandas as pd
 import streamlit as st
-from datetime import datetime
 import os
-import re
+
+from src.predictions import STORE_PATH, load_run, read_runs
 
 st.set_page_config(layout='wide')
 
@@ -20,30 +20,33 @@ st.markdown(
 
 st.title("NFL Scoring Predictions")
 
-pred_dir = "predictions"
-csv_files = [f for f in os.listdir(pred_dir) if f.endswith('.csv')]
-if not csv_files:
-    raise FileNotFoundError("No predictions files found.")
-
-# Get latest CSV file
-latest_csv = max(csv_files, key=lambda x: os.path.getmtime(os.path.join(pred_dir, x)))
-latest_path = os.path.join(pred_dir, latest_csv)
-predictions = pd.read_csv(latest_path)
-
-# --- Extract date from filename (handles optional _v1, _v2, etc.) ---
-match = re.search(r'_(\d{8})', latest_csv)
-if match:
-    file_date_str = match.group(1)  # e.g., '20250905'
-    file_date = datetime.strptime(file_date_str, "%Y%m%d")
-    formatted_date = file_date.strftime("%#m/%#d/%y")  # e.g., '9/5/25' on Windows
-    st.markdown(f"<p style='color:red; font-weight:bold;'>Predictions last updated on {formatted_date}</p>", unsafe_allow_html=True)
-else:
-    st.warning("Could not parse update date from filename.")
-
-# Compute NFL week
-start_date = datetime(2025, 9, 4)  # Season start
-predictions['date'] = pd.to_datetime(predictions['date'])
-predictions['week'] = ((predictions['date'] - start_date).dt.days // 7 + 1).clip(lower=1)
+# Cached loaders keyed by the prediction store's modification time, so widget interactions
+# don't query anything and a new pipeline run is picked up on the next page load
+@st.cache_data
+def load_runs(store_mtime):
+    return read_runs(STORE_PATH)
+
+
+@st.cache_data
+def load_predictions(run_id, store_mtime):
+    return load_run(run_id, STORE_PATH)
+
+
+store_mtime = os.path.getmtime(STORE_PATH) if os.path.exists(STORE_PATH) else None
+runs = load_runs(store_mtime)
+if runs.empty:
+    raise FileNotFoundError("No predictions found.")
+store_mtime = os.path.getmtime(STORE_PATH)
+
+# Latest run first; older runs can be browsed from the dropdown
+created = pd.to_datetime(runs['created_at'])
+run_labels = [f"{c:%b %d, %Y %H:%M} ({run_id})" for c, run_id in zip(created, runs['run_id'])]
+selected_run = st.selectbox('Prediction Run', range(len(runs)), format_func=lambda i: run_labels[i])
+predictions = load_predictions(runs['run_id'].iloc[selected_run], store_mtime)
+
+run_date = created.iloc[selected_run]
+formatted_date = f"{run_date.month}/{run_date.day}/{run_date:%y}"  # e.g., '9/5/25'
+st.markdown(f"<p style='color:red; font-weight:bold;'>Predictions last updated on {formatted_date}</p>", unsafe_allow_html=True)
 
 # Dropdown to select week
 week_options = sorted(predictions['week'].unique())
@@ -0,0 +1,90 @@
+"""
+Benchmark model training resources and artifact formats.
+
+Reports forest fit time (single core vs all cores), artifact size and load time for the
+joblib dump (plain, memory-mapped, compressed) and the compact array-backed export, and
+predict time for both. Uses a synthetic model matrix, so it runs offline.
+
+    python benchmarks/bench_model.py --games 2000 --n-estimators 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.forest import CompactForest
+from src.model import FEATURES, make_model
+
+
+def synthetic_matrix(n_games, seed=0):
+    """Features shaped like the model matrix and a total_points target loosely driven by them."""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_games, len(FEATURES))), columns=FEATURES)
+    X["total_line"] = rng.normal(45, 4, n_games).round(1)
+    y = X["total_line"] + 2 * X.iloc[:, 1:5].sum(axis=1) + rng.normal(0, 10, n_games)
+    return X, y
+
+
+def timed(fn, repeat=1):
+    """Best wall time of `repeat` calls, and the last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(n_games=2000, n_estimators=500, max_depth=None, min_samples_leaf=1, repeat=3):
+    X, y = synthetic_matrix(n_games)
+    params = {"n_estimators": n_estimators, "max_depth": max_depth, "min_samples_leaf": min_samples_leaf}
+
+    print(f"Model matrix: {n_games} games x {len(FEATURES)} features, {params}")
+
+    for n_jobs in (1, -1):
+        seconds, model = timed(lambda: make_model(42, n_jobs=n_jobs, **params).fit(X, y))
+        print(f"fit n_jobs={n_jobs:>2}: {seconds:8.3f} s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {
+            "joblib": os.path.join(tmp, "model.joblib"),
+            "joblib compress=3": os.path.join(tmp, "model_z.joblib"),
+            "compact npz": os.path.join(tmp, "model.npz"),
+        }
+        joblib.dump(model, paths["joblib"])
+        joblib.dump(model, paths["joblib compress=3"], compress=3)
+        CompactForest.from_sklearn(model).save(paths["compact npz"])
+
+        loaders = {
+            "joblib": lambda: joblib.load(paths["joblib"]),
+            "joblib mmap": lambda: joblib.load(paths["joblib"], mmap_mode="r"),
+            "joblib compress=3": lambda: joblib.load(paths["joblib compress=3"]),
+            "compact npz": lambda: CompactForest.load(paths["compact npz"]),
+        }
+
+        print(f"{'artifact':<20}{'size MB':>10}{'load s':>10}{'predict s':>12}")
+        for name, load in loaders.items():
+            path = paths[name.replace(" mmap", "")]
+            load_seconds, loaded = timed(load, repeat)
+            predict_seconds, _ = timed(lambda: loaded.predict(X), repeat)
+            size = os.path.getsize(path) / 1e6
+            print(f"{name:<20}{size:>10.2f}{load_seconds:>10.3f}{predict_seconds:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--n-estimators", type=int, default=500)
+    parser.add_argument("--max-depth", type=int)
+    parser.add_argument("--min-samples-leaf", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.games, args.n_estimators, args.max_depth, args.min_samples_leaf, args.repeat)
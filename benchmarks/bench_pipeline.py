@@ -0,0 +1,220 @@
+"""
+Benchmark the pipeline stages on synthetic data and flag regressions against a baseline.
+
+Generates nflverse-shaped games and play-by-play (benchmarks/synthetic.py) in a temporary
+directory and times load_data, the feature stages (and the home/away pivot), train_and_evaluate and
+prepare_upcoming_team_games on them (best of --repeat runs). Weather comes from a local
+stand-in, so the suite runs fully offline. Results are written as JSON; pass an earlier
+result as --baseline to fail (exit status 1) when a stage got slower than the threshold.
+
+    python benchmarks/bench_pipeline.py --seasons 10 --teams 32
+    python benchmarks/bench_pipeline.py --seasons 10 --baseline benchmarks/results/<file>.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from synthetic import write_dataset
+from src.aggregate import aggregate_plays
+from src.basic import create_basic_features
+from src.defense import create_defense_features
+from src.load import load_data
+from src.model import train_and_evaluate
+from src.pace import create_pace_features
+from src.pivot import pivot_home_away
+from src.qb import create_qb_features
+from src.upcoming import prepare_upcoming_team_games
+from src.weather import WEATHER_COLUMNS, create_weather_features
+from src.weather_forecast import TEAM_ABBREV
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# A stage regresses when it is this much slower than the baseline (0.25 = 25%) ...
+THRESHOLD = 0.25
+# ... and by at least this many seconds, so timer noise on tiny stages is not flagged
+MIN_SECONDS = 0.05
+
+
+def fake_weather(lat, lon, start, end):
+    """Offline stand-in for src.weather.fetch_meteostat."""
+    dates = pd.date_range(start, end, freq="D")
+    rng = np.random.default_rng(abs(hash((round(lat, 4), round(lon, 4)))) % (1 << 32))
+    return pd.DataFrame({
+        "date": dates,
+        "temperature": rng.normal(12, 8, len(dates)),
+        "precipitation": rng.gamma(0.5, 2, len(dates)),
+        "wind_speed": rng.gamma(2, 6, len(dates)),
+    })[["date"] + WEATHER_COLUMNS]
+
+
+def upcoming_slate(n_games=16, seed=0):
+    """Odds-API-shaped upcoming games (full team names) and matching forecast weather."""
+    rng = np.random.default_rng(seed)
+    names = rng.permutation(sorted(TEAM_ABBREV))[: 2 * n_games]
+    kickoff = pd.Timestamp("2025-09-14 13:00") + pd.to_timedelta(rng.choice([0, 3, 7], n_games), unit="h")
+    totals = pd.DataFrame({
+        "home_team": names[::2],
+        "away_team": names[1::2],
+        "commence_time": kickoff,
+        "total_line": rng.normal(45, 4, n_games).round(0) + 0.5,
+        "bookmaker": "DraftKings",
+    })
+    weather = pd.DataFrame({
+        "home_team": totals["home_team"].map(TEAM_ABBREV),
+        "kickoff_time": kickoff,
+        "temperature_F": rng.normal(65, 10, n_games),
+        "wind_speed_mph": rng.gamma(2, 4, n_games),
+    })
+    return totals, weather
+
+
+def timed(fn, setup=None, repeat=1):
+    """Best wall time of `repeat` calls of fn(setup()) (setup untimed, output silenced), and the last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        args = setup() if setup is not None else ()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn(*args)
+            seconds = time.perf_counter() - start
+        best = min(best, seconds)
+    return best, result
+
+
+def run(n_seasons=5, n_teams=32, repeat=3, n_estimators=100, seed=0):
+    """
+    Time every stage on a fresh synthetic dataset.
+
+    Returns
+    -------
+    dict
+        config, environment and stages ({stage: best seconds}), as written to JSON.
+    """
+    if not 1 <= n_seasons <= 30:
+        raise ValueError(f"n_seasons must be between 1 and 30, got {n_seasons}")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        games, plays = write_dataset(tmp, n_seasons, n_teams, seed)
+        seasons = sorted(games["season"].unique().tolist())
+        print(f"Synthetic data: {n_seasons} seasons, {n_teams} teams, {len(games)} games, {len(plays)} plays")
+        del games, plays
+
+        # the pipeline reads and writes data/ and model/ relative to the working directory
+        os.chdir(tmp)
+        try:
+            stages = {}
+
+            stages["load_data"], (games, plays) = timed(load_data, repeat=repeat)
+            with contextlib.redirect_stdout(io.StringIO()):
+                team_stats, qb_stats = aggregate_plays(plays)
+
+            stages["create_basic_features"], team_games = timed(
+                create_basic_features, lambda: (games.copy(),), repeat)
+            stages["create_qb_features"], team_games = timed(
+                create_qb_features, lambda: (team_games.copy(), team_stats, qb_stats), repeat)
+            stages["create_defense_features"], team_games = timed(
+                create_defense_features, lambda: (team_games.copy(), team_stats), repeat)
+            stages["create_pace_features"], team_games = timed(
+                create_pace_features, lambda: (team_games.copy(), team_stats), repeat)
+            stages["pivot_home_away"], team_games = timed(pivot_home_away, lambda: (team_games,), repeat)
+
+            # a fresh weather store each run, so every run fetches (from the stand-in) and joins
+            def weather_setup():
+                for path in ("data/weather.parquet", "data/weather_coverage.parquet"):
+                    if os.path.exists(path):
+                        os.remove(path)
+                return team_games.copy(), fake_weather
+            stages["create_weather_features"], team_games = timed(create_weather_features, weather_setup, repeat)
+
+            # a fresh model path each run, so the saved model is never reused
+            train_seasons, test_seasons = (seasons[:-1], seasons[-1:]) if len(seasons) > 1 else (seasons, seasons)
+
+            def train_setup():
+                return (team_games, f"model/bench_{time.perf_counter_ns()}.joblib", train_seasons, test_seasons, 5, 42)
+            stages["train_and_evaluate"], model = timed(
+                lambda *args: train_and_evaluate(*args, n_estimators=n_estimators), train_setup, repeat)
+
+            totals, weather = upcoming_slate(seed=seed)
+            stages["prepare_upcoming_team_games"], _ = timed(
+                prepare_upcoming_team_games, lambda: (totals.copy(), team_games, weather.copy(), model), repeat)
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "created_at": datetime.now().isoformat(),
+        "config": {"seasons": n_seasons, "teams": n_teams, "repeat": repeat, "n_estimators": n_estimators, "seed": seed},
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "stages": {name: round(seconds, 4) for name, seconds in stages.items()},
+    }
+
+
+def regressions(result, baseline, threshold=THRESHOLD, min_seconds=MIN_SECONDS) -> pd.DataFrame:
+    """Per-stage comparison with a baseline result; `regressed` marks stages slower than the threshold."""
+    if result["config"] != baseline["config"]:
+        print(f"Warning: baseline config {baseline['config']} differs from {result['config']}")
+    stages = [name for name in result["stages"] if name in baseline["stages"]]
+    comparison = pd.DataFrame({
+        "stage": stages,
+        "baseline_s": [baseline["stages"][name] for name in stages],
+        "current_s": [result["stages"][name] for name in stages],
+    })
+    comparison["ratio"] = comparison["current_s"] / comparison["baseline_s"]
+    comparison["regressed"] = (
+        (comparison["current_s"] > comparison["baseline_s"] * (1 + threshold))
+        & (comparison["current_s"] - comparison["baseline_s"] > min_seconds)
+    )
+    return comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=5, help="Number of synthetic seasons (1-30).")
+    parser.add_argument("--teams", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/pipeline_<config>_<time>.json).")
+    parser.add_argument("--baseline", help="Earlier result JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Allowed slowdown per stage (0.25 = 25%%).")
+    args = parser.parse_args()
+
+    result = run(args.seasons, args.teams, args.repeat, args.n_estimators, args.seed)
+    print(pd.Series(result["stages"], name="seconds").to_string())
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"pipeline_{args.seasons}s_{args.teams}t_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved results to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        comparison = regressions(result, baseline, args.threshold)
+        print(comparison.to_string(index=False))
+        if comparison["regressed"].any():
+            print(f"Regression: {', '.join(comparison.loc[comparison['regressed'], 'stage'])}")
+            sys.exit(1)
@@ -0,0 +1,159 @@
+"""
+Synthetic nflverse-shaped games and play-by-play, for running the pipeline offline.
+
+Games have the schedule columns the feature stages read (plus a few of the other
+nflverse schedule columns); plays have every column of src.aggregate.PLAY_COLUMNS
+plus filler columns standing in for the ~370 unused nflverse play-by-play columns.
+Output is deterministic for a given seed.
+
+    python benchmarks/synthetic.py --seasons 10 --teams 32 --out /tmp/nfl
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.load import season_partition
+from src.weather import STADIUM_COORDS
+
+# Last synthetic season; seasons count back from here
+LAST_SEASON = 2024
+
+WEEKS = 17
+PLAYS_PER_GAME = 130
+
+# Unused play-by-play columns carried along so column pruning has something to prune
+FILLER_COLUMNS = 40
+
+PLAY_TYPES = np.array(["pass", "run", "punt", "no_play", None], dtype=object)
+PLAY_TYPE_P = [0.25, 0.25, 0.22, 0.2, 0.08]
+
+
+def team_codes(n_teams):
+    """Real team codes first (so stadium weather applies), then made-up ones."""
+    codes = sorted(STADIUM_COORDS)[:n_teams]
+    return codes + [f"T{i:02d}" for i in range(len(codes), n_teams)]
+
+
+def synthetic_games(n_seasons=5, n_teams=32, seed=0) -> pd.DataFrame:
+    """A full schedule per season: WEEKS weeks, every team playing once a week."""
+    if n_teams < 2 or n_teams % 2:
+        raise ValueError(f"n_teams must be an even number >= 2, got {n_teams}")
+    rng = np.random.default_rng(seed)
+    teams = np.array(team_codes(n_teams), dtype=object)
+    # per-team scoring strength persists across seasons, so rolling features carry signal
+    offense = dict(zip(teams, rng.normal(22, 3, n_teams)))
+
+    frames = []
+    for season in range(LAST_SEASON - n_seasons + 1, LAST_SEASON + 1):
+        opening = pd.Timestamp(f"{season}-09-08")
+        for week in range(1, WEEKS + 1):
+            order = rng.permutation(teams)
+            home, away = order[::2], order[1::2]
+            n = len(home)
+            expected = np.array([offense[h] + offense[a] for h, a in zip(home, away)])
+            gameday = opening + pd.Timedelta(weeks=week - 1) + pd.to_timedelta(rng.choice([0, 3, 4], n, p=[0.1, 0.8, 0.1]), unit="D")
+            frames.append(pd.DataFrame({
+                "game_id": [f"{season}_{week:02d}_{a}_{h}" for h, a in zip(home, away)],
+                "season": season,
+                "game_type": "REG",
+                "week": week,
+                "gameday": gameday.strftime("%Y-%m-%d"),
+                "gametime": rng.choice(["13:00", "16:25", "20:20"], n),
+                "away_team": away,
+                "away_score": rng.poisson(expected / 2).astype(float),
+                "home_team": home,
+                "home_score": rng.poisson(expected / 2 + 1.5).astype(float),
+                "spread_line": rng.normal(0, 5, n).round(1),
+                "total_line": (expected + rng.normal(0, 3, n)).round(0) + 0.5,
+                "roof": rng.choice(["outdoors", "dome"], n),
+                "temp": rng.normal(60, 15, n).round(0),
+                "wind": rng.gamma(2, 4, n).round(0),
+            }))
+    games = pd.concat(frames, ignore_index=True)
+    games["total"] = games["home_score"] + games["away_score"]
+    return games
+
+
+def synthetic_plays(games: pd.DataFrame, seed=0) -> pd.DataFrame:
+    """Play-by-play for every game: alternating possessions, one or two QBs per team-season."""
+    rng = np.random.default_rng(seed + 1)
+    n_games = len(games)
+    n = n_games * PLAYS_PER_GAME
+    game_idx = np.repeat(np.arange(n_games), PLAYS_PER_GAME)
+
+    home = games["home_team"].to_numpy(dtype=object)[game_idx]
+    away = games["away_team"].to_numpy(dtype=object)[game_idx]
+    drive = np.tile(np.arange(PLAYS_PER_GAME) // 6, n_games)
+    home_ball = (drive + rng.integers(0, 2, n_games)[game_idx]) % 2 == 0
+    posteam = np.where(home_ball, home, away)
+    defteam = np.where(home_ball, away, home)
+    no_team = rng.random(n) < 0.05
+    posteam[no_team] = None
+    defteam[no_team] = None
+
+    play_type = rng.choice(PLAY_TYPES, n, p=PLAY_TYPE_P)
+    season = games["season"].to_numpy()[game_idx]
+    # most teams keep their starter all season; a backup comes in now and then
+    qb = np.char.add(np.char.add(posteam.astype(str), "-QB"), (rng.random(n) < 0.1).astype(int).astype(str))
+    qb = np.char.add(np.char.add(qb, "-"), season.astype(str)).astype(object)
+
+    is_pass = (play_type == "pass") & ~no_team
+    is_run = (play_type == "run") & ~no_team
+    scramble = is_run & (rng.random(n) < 0.15)
+    passer = np.where(is_pass, qb, None)
+    rusher = np.where(scramble, qb, np.where(is_run, np.char.add(posteam.astype(str), "-RB").astype(object), None))
+
+    plays = pd.DataFrame({
+        "play_id": np.tile(np.arange(1, PLAYS_PER_GAME + 1) * 25.0, n_games) + rng.integers(0, 20, n),
+        "game_id": games["game_id"].to_numpy(dtype=object)[game_idx],
+        "season": season,
+        "posteam": posteam,
+        "defteam": defteam,
+        "play_type": play_type,
+        "passer_player_name": passer,
+        "rusher_player_name": rusher,
+        "qb_dropback": (is_pass | scramble).astype(float),
+        "epa": np.where(rng.random(n) < 0.02, np.nan, rng.normal(0, 1.3, n)),
+    })
+    for i in range(FILLER_COLUMNS):
+        plays[f"extra_{i}"] = rng.random(n)
+    return plays
+
+
+def write_dataset(out_dir, n_seasons=5, n_teams=32, seed=0):
+    """
+    Write games and Hive-partitioned plays in the layout of the download script, under out_dir/data.
+
+    Returns
+    -------
+    games, plays : pd.DataFrame
+    """
+    games = synthetic_games(n_seasons, n_teams, seed)
+    plays = synthetic_plays(games, seed)
+
+    data_dir = os.path.join(out_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    games.to_parquet(os.path.join(data_dir, "games.parquet"), index=False)
+    for season, season_plays in plays.groupby("season"):
+        partition = season_partition(season, os.path.join(data_dir, "plays"))
+        os.makedirs(partition, exist_ok=True)
+        season_plays.drop(columns="season").to_parquet(os.path.join(partition, "part-0.parquet"), index=False)
+
+    return games, plays
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=5, help="Number of seasons (1-30).")
+    parser.add_argument("--teams", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="Directory to write data/ into.")
+    args = parser.parse_args()
+
+    games, plays = write_dataset(args.out, args.seasons, args.teams, args.seed)
+    print(f"Wrote {len(games)} games and {len(plays)} plays to {os.path.join(args.out, 'data')}")
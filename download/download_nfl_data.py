@@ -1,5 +1,10 @@
+import argparse
+import importlib
+import json
 import os
-import nfl_data_py as nfl
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
 import pandas as pd
 
 # Ensure data directory exists at repo root
@@ -7,12 +12,193 @@ repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 data_dir = os.path.join(repo_root, "data")
 os.makedirs(data_dir, exist_ok=True)
 
-print("Downloading fresh historical game-level data using nfl_data_py...")
-games = nfl.import_schedules([y for y in range(2021, 2025)])
-games.to_parquet(os.path.join(data_dir, "games.parquet"), index=False)
+# Play-by-play is stored Hive-partitioned by season: data/plays/season=YYYY/*.parquet
+plays_dir = os.path.join(data_dir, "plays")
 
-print("Downloading fresh historical play-level data using nfl_data_py...")
-plays = nfl.import_pbp_data([y for y in range(2021, 2025)])
-plays.to_parquet(os.path.join(data_dir, "plays.parquet"), index=False)
+SEASONS = [y for y in range(2021, 2025)]
+WORKERS = 4
 
-print("Download complete. Files saved in:", data_dir)
+# Written into a season's partition once its files are fully on disk
+MARKER = "_SUCCESS"
+
+
+def fetch_pbp_season(season):
+    """Default fetch layer: one season of nflverse play-by-play via nfl_data_py."""
+    import nfl_data_py as nfl
+    return nfl.import_pbp_data([season])
+
+
+def fetch_schedules(seasons):
+    """Default fetch layer: nflverse schedules (game-level data) via nfl_data_py."""
+    import nfl_data_py as nfl
+    return nfl.import_schedules(seasons)
+
+
+def partition_dir(season):
+    return os.path.join(plays_dir, f"season={season}")
+
+
+def season_is_complete(season):
+    """True if the season's partition was fully written after the season had finished."""
+    marker = os.path.join(partition_dir(season), MARKER)
+    if not os.path.exists(marker):
+        return False
+    with open(marker) as f:
+        return json.load(f).get("complete", False)
+
+
+def download_season(season, fetch, complete):
+    """Fetch one season and (re)write its partition; the marker is written last so interrupted runs are redone."""
+    plays = fetch(season)
+
+    out_dir = partition_dir(season)
+    os.makedirs(out_dir, exist_ok=True)
+    for name in os.listdir(out_dir):
+        os.remove(os.path.join(out_dir, name))
+
+    # season is encoded in the partition path, not stored in the file
+    tmp_path = os.path.join(out_dir, ".part-0.parquet.tmp")
+    plays.drop(columns=["season"], errors="ignore").to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, os.path.join(out_dir, "part-0.parquet"))
+
+    with open(os.path.join(out_dir, MARKER), "w") as f:
+        json.dump({"rows": len(plays), "complete": bool(complete), "downloaded_at": datetime.now().isoformat()}, f)
+
+    return season, len(plays)
+
+
+def save_games(games):
+    """Write downloaded schedules into games.parquet, replacing only the seasons they cover."""
+    path = os.path.join(data_dir, "games.parquet")
+    if os.path.exists(path):
+        cached = pd.read_parquet(path)
+        games = pd.concat([cached[~cached["season"].isin(games["season"].unique())], games], ignore_index=True)
+        games = games.sort_values(["season", "week"], kind="stable").reset_index(drop=True)
+    tmp_path = f"{path}.tmp"
+    games.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def download_all(seasons=SEASONS, fetch=fetch_pbp_season, schedules=fetch_schedules, workers=WORKERS, force=False):
+    """
+    Download game-level data and per-season play-by-play partitions.
+
+    Seasons whose partition is already complete (fully written after the season ended)
+    are skipped unless `force` is set; missing, interrupted or in-progress seasons are
+    fetched in parallel worker processes.
+
+    Parameters
+    ----------
+    seasons : iterable of int
+        Seasons to download.
+    fetch : callable
+        fetch(season) -> play-by-play DataFrame. Must be picklable (a module-level function);
+        tests can pass one that reads local fixtures.
+    schedules : callable
+        schedules(seasons) -> games DataFrame.
+    workers : int
+        Number of worker processes.
+    force : bool
+        Re-download complete seasons too.
+    """
+    seasons = list(seasons)
+
+    print("Downloading fresh historical game-level data...")
+    games = schedules(seasons)
+    save_games(games)
+
+    # a season is finished once every scheduled game has a score
+    finished = games.groupby("season")["home_score"].apply(lambda s: s.notna().all()).to_dict()
+
+    todo = [s for s in seasons if force or not season_is_complete(s)]
+    skipped = sorted(set(seasons) - set(todo))
+    if skipped:
+        print(f"Skipping already complete seasons: {skipped}")
+    if not todo:
+        print("All seasons are up to date.")
+        return
+
+    print(f"Downloading play-level data for seasons {todo} with {workers} workers...")
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(download_season, s, fetch, finished.get(s, False)): s for s in todo}
+        for future in as_completed(futures):
+            try:
+                season, rows = future.result()
+            except Exception as e:
+                failed.append(futures[future])
+                print(f"Season {futures[future]} failed: {e}")
+                continue
+            print(f"Season {season}: {rows} plays saved to {partition_dir(season)}")
+
+    if failed:
+        raise RuntimeError(f"Download failed for seasons {sorted(failed)}; re-run to resume.")
+
+    print("Download complete. Files saved in:", data_dir)
+
+
+def download_incremental(season=None, fetch=fetch_pbp_season, schedules=fetch_schedules):
+    """Fetch one season and add only its newly completed games to the data and feature store."""
+    # src uses paths relative to the repo root
+    os.chdir(repo_root)
+    sys.path.insert(0, repo_root)
+    from src.incremental import update_team_games
+
+    cached_games = pd.read_parquet(os.path.join(data_dir, "games.parquet"), columns=["game_id", "season", "home_score"])
+    season = season or int(cached_games["season"].max())
+
+    # the cached schedule also lists games that were unplayed when it was downloaded
+    final_ids = cached_games.loc[cached_games["home_score"].notna(), "game_id"]
+
+    print(f"Downloading {season} game-level data...")
+    games = schedules([season])
+    new_games = games[
+        games["home_score"].notna() & ~games["game_id"].isin(final_ids)
+    ]
+    if new_games.empty:
+        print("No new completed games.")
+        return
+
+    print(f"Downloading {season} play-level data...")
+    plays = fetch(season)
+    new_plays = plays[plays["game_id"].isin(new_games["game_id"])]
+
+    update_team_games(new_games, new_plays)
+
+
+def _load_function(path):
+    """Resolve 'package.module:function' to a callable."""
+    module, name = path.split(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _parse_seasons(text):
+    """'2021-2024' or '2019,2021' -> list of seasons."""
+    seasons = []
+    for part in text.split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            seasons.extend(range(int(start), int(end) + 1))
+        else:
+            seasons.append(int(part))
+    return seasons
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download NFL game-level and play-level data.")
+    parser.add_argument("--seasons", type=_parse_seasons, default=SEASONS, help="e.g. 1999-2024 or 2021,2023 (default: 2021-2024).")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Parallel season downloads.")
+    parser.add_argument("--force", action="store_true", help="Re-download seasons that are already complete.")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only add newly completed games (e.g. a weekly refresh) instead of re-downloading seasons.",
+    )
+    parser.add_argument("--season", type=int, help="Season to check for new games in incremental mode (default: latest cached).")
+    parser.add_argument("--pbp-source", type=_load_function, default=fetch_pbp_season, help="module:function returning one season of plays.")
+    parser.add_argument("--schedule-source", type=_load_function, default=fetch_schedules, help="module:function returning schedules for a list of seasons.")
+    args = parser.parse_args()
+
+    if args.incremental:
+        download_incremental(args.season, fetch=args.pbp_source, schedules=args.schedule_source)
+    else:
+        download_all(args.seasons, fetch=args.pbp_source, schedules=args.schedule_source, workers=args.workers, force=args.force)
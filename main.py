@@ -1,65 +1,123 @@
-from src.load import load_data
-from src.basic import create_basic_features
-from src.pace import create_pace_features
-from src.weather import create_weather_features
+import argparse
+import os
+
+from src.features import build_team_games
+from src.load import CHUNK_BY, load_games
 from src.totals import get_totals
-from src.qb import create_qb_features
-from src.defense import create_defense_features
-from src.model import train_and_evaluate
+from src.model import COMPACT_MODEL_PATH, MODEL_PATH, load_compact_model, load_model, read_metadata, train_and_evaluate
 from src.weather_forecast import get_forecasted_weather
-from src.upcoming import prepare_upcoming_team_games
-from src.predictions import save_predictions
-
-
-def run_analysis():
-
-    # Load historical play-level and game-level data using nfl_data_py
-    games, plays = load_data()
-
-    # Add basic historical features like average points for/against 
-    team_games = create_basic_features(games)
-
-    # Add QB EPA features
-    team_games = create_qb_features(team_games, plays)
-
-    # Add defense EPA features
-    team_games = create_defense_features(team_games, plays)
-
-    # Add pace features
-    team_games = create_pace_features(team_games, plays)
-
-    # Add weather features
-    team_games = create_weather_features(team_games)
-
-    # Load Vegas totals for upcoming games
-    totals = get_totals()
-
-    # Load weather forecasts
-    weather_features = get_forecasted_weather(totals)
-
-    # Train model and print train/test results
-    model = train_and_evaluate(
-        team_games = team_games,
-        model_path = "model/rf_total_points_model.joblib",
-        train_seasons = [2021, 2022, 2023],
-        test_seasons = [2024],
-        inspection_margin = 5,
-        random_state = 42
-    )
-
-    # Prepare upcoming games with all features and predict
-    upcoming_team_games = prepare_upcoming_team_games(
-        totals,
-        team_games,
-        weather_features,
-        model
-    )
-
-    # Use model to generate predictions for upcoming games
-    predictions = save_predictions(upcoming_team_games)
+from src.upcoming import slate_games
+from src.scoring import TEAM_STATE_PATH, load_team_state, save_team_state, score, team_state_snapshot
+from src.predictions import record_results, report_path, save_predictions
+from src.instrument import PROFILE_MODES, run_report, stage
+
+
+def run_analysis(predict_only=False, profile_stage=None, profile_mode="cpu", chunk_by=None):
+    """
+    Build features, train (or reuse) the model and predict upcoming games.
+
+    With `predict_only`, the persisted model (its compact export, if there is one) and the
+    team state saved by the last full run are loaded, as the prediction service does;
+    the feature build, training and evaluation are skipped entirely, and so is recording
+    results (the next full run fills them in).
+
+    Predictions are appended to the prediction store as a new run (see src.predictions),
+    after filling in the results of earlier predictions for games that have been played.
+
+    Every stage is timed (see src.instrument) and the run report is saved as
+    predictions/reports/<run_id>.json; `profile_stage` additionally
+    profiles one stage (cProfile, or tracemalloc with profile_mode="memory").
+
+    `chunk_by` ("season" or "row_group") aggregates play-by-play one chunk at a time
+    (see `build_team_games`), for histories that don't fit in memory.
+    """
+
+    with run_report(profile_stage, profile_mode) as report:
+
+        if predict_only:
+            # Saved model and team state only: no feature build, training or team state write
+            with stage("load_model") as s:
+                model = load_compact_model(COMPACT_MODEL_PATH)
+                if model is None:
+                    model, _ = load_model(MODEL_PATH)
+                if model is None or not os.path.exists(TEAM_STATE_PATH):
+                    raise FileNotFoundError(
+                        f"No trained model or team state in {os.path.dirname(MODEL_PATH)}. Run without --predict-only first."
+                    )
+                team_state = s.output(load_team_state(TEAM_STATE_PATH))
+        else:
+            # Build historical team-game features (load, basic, QB, defense, pace, home/away pivot, weather),
+            # reusing cached stages from the feature store when their inputs are unchanged
+            with stage("features") as s:
+                team_games = s.output(build_team_games(chunk_by=chunk_by))
+
+            # Record closing lines and final totals of previously predicted games
+            with stage("record_results"):
+                record_results(load_games())
+
+            # Train model (reusing the saved one if its training data is unchanged) and print train/test results
+            with stage("train", team_games):
+                model = train_and_evaluate(
+                    team_games = team_games,
+                    model_path = MODEL_PATH,
+                    train_seasons = [2021, 2022, 2023],
+                    test_seasons = [2024],
+                    inspection_margin = 5,
+                    random_state = 42,
+                    compact_path = COMPACT_MODEL_PATH
+                )
+
+            # Save the latest per-team state for the prediction service (src.service). Written
+            # after the model and its compact export: the service reloads when this file changes
+            with stage("team_state", team_games) as s:
+                team_state = s.output(team_state_snapshot(team_games))
+                save_team_state(team_state)
+
+        # Load Vegas totals for upcoming games (TTL-cached, see src.totals)
+        with stage("totals") as s:
+            totals = s.output(get_totals())
+
+        # Load weather forecasts (TTL-cached per stadium, see src.weather_forecast)
+        with stage("weather_forecast", totals) as s:
+            weather_features = s.output(get_forecasted_weather(totals))
+
+        # Score upcoming games with all features against the latest team state
+        with stage("upcoming", totals, weather_features) as s:
+            upcoming_team_games = s.output(
+                score(slate_games(totals, weather_features), team_state, model, distribution=True)
+            )
+
+        # Use model to generate predictions for upcoming games
+        with stage("save_predictions", upcoming_team_games) as s:
+            metadata = read_metadata(MODEL_PATH)
+            predictions = s.output(save_predictions(
+                upcoming_team_games,
+                model_fingerprint = metadata["fingerprint"] if metadata else None
+            ))
+
+    print(report.summary().to_string(index=False))
+    # the run id of this run's predictions, not the newest in the store (runs can overlap)
+    if len(predictions):
+        report.save(report_path(predictions["run_id"].iloc[0]))
+    else:
+        print("No upcoming games were predicted; the run report was not saved.")
 
     return predictions
 
 
 if __name__ == "__main__":
-    run_analysis()
+    parser = argparse.ArgumentParser(description="Predict NFL game totals for upcoming games.")
+    parser.add_argument("--predict-only", action="store_true", help="Use the saved model; skip training.")
+    parser.add_argument("--profile-stage", help="Profile one stage (e.g. features, qb, train, upcoming).")
+    parser.add_argument("--profile-mode", choices=PROFILE_MODES, default="cpu",
+                        help="cProfile (cpu) or tracemalloc (memory) for --profile-stage.")
+    parser.add_argument("--chunk-by", choices=CHUNK_BY,
+                        help="Aggregate play-by-play one season (or row group) at a time to bound memory.")
+    args = parser.parse_args()
+
+    run_analysis(
+        predict_only=args.predict_only,
+        profile_stage=args.profile_stage,
+        profile_mode=args.profile_mode,
+        chunk_by=args.chunk_by,
+    )
@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+
+# Per-(game, team) statistics computed in the single aggregation pass.
+# name -> (team column the play is credited to, value column, reducer)
+#   "mean"  : NaN-skipping mean of the value column
+#   "count" : number of plays with a non-null value column
+# Adding a stat here makes it available as a column of `team_stats`.
+TEAM_STATS = {
+    "def_epa": ("defteam", "epa", "mean"),
+    "plays": ("posteam", "play_type", "count"),
+}
+
+# Play-by-play columns read by the aggregation pass (see src.load.required_play_columns)
+PLAY_COLUMNS = list(dict.fromkeys(
+    ["game_id", "posteam", "defteam"]
+    + [value for _, value, _ in TEAM_STATS.values()]
+    + ["play_id", "epa", "passer_player_name", "rusher_player_name", "qb_dropback"]
+))
+
+# How a play is attributed to a QB in the per-passer EPA table
+_PASS, _DROPBACK, _RUSH = 0, 1, 2
+
+
+def _factorize_pair(plays, left, right):
+    """Factorize two columns against one shared set of uniques; returns (left codes, right codes, uniques)."""
+    n = len(plays)
+    codes, uniques = pd.factorize(pd.concat([plays[left], plays[right]], ignore_index=True))
+    return codes[:n], codes[n:], np.asarray(uniques, dtype=object)
+
+
+def _partial_aggregates(plays: pd.DataFrame):
+    """
+    Scan play-by-play once and return additive per-key partial aggregates.
+
+    Everything is expressed as sums/counts (plus the earliest pass per team) so that
+    partials from disjoint sets of plays can be combined exactly.
+
+    Returns
+    -------
+    team_partial : pd.DataFrame
+        One row per (game_id, team) with `<stat>_sum`/`<stat>_count` columns for each
+        TEAM_STATS entry, plus `starting_qb` and `starting_qb_play_id`.
+    qb_partial : pd.DataFrame
+        One row per (game_id, team, qb_name, kind) with `epa_sum` and `epa_count`,
+        where kind records whether the play was a pass, a dropback or a QB run.
+    """
+    game_codes, game_ids = pd.factorize(plays["game_id"])
+    game_ids = np.asarray(game_ids, dtype=object)
+    pos_codes, def_codes, teams = _factorize_pair(plays, "posteam", "defteam")
+    n_teams = max(len(teams), 1)
+    n_keys = len(game_ids) * n_teams
+
+    def team_key(codes):
+        return np.where((codes >= 0) & (game_codes >= 0), game_codes * n_teams + codes, -1)
+
+    keys = {"posteam": team_key(pos_codes), "defteam": team_key(def_codes)}
+
+    # --- per-(game, team) stats ---
+    team_columns = {}
+    present = np.zeros(n_keys, dtype=bool)
+    for name, (side, value, reducer) in TEAM_STATS.items():
+        key = keys[side]
+        present[key[key >= 0]] = True
+        valid = (key >= 0) & plays[value].notna().to_numpy()
+        team_columns[f"{name}_count"] = np.bincount(key[valid], minlength=n_keys)
+        if reducer == "mean":
+            weights = plays[value].to_numpy(dtype="float64")[valid]
+            team_columns[f"{name}_sum"] = np.bincount(key[valid], weights=weights, minlength=n_keys)
+
+    # --- starting QB: passer on the team's earliest pass play ---
+    passer_codes, rusher_codes, names = _factorize_pair(plays, "passer_player_name", "rusher_player_name")
+    play_ids = plays["play_id"].to_numpy(dtype="float64")
+    pos_key = keys["posteam"]
+
+    pass_rows = np.flatnonzero((pos_key >= 0) & (passer_codes >= 0))
+    order = pass_rows[np.lexsort((play_ids[pass_rows], pos_key[pass_rows]))]
+    first_keys, first_idx = np.unique(pos_key[order], return_index=True)
+    first_rows = order[first_idx]
+
+    starting_qb = np.full(n_keys, None, dtype=object)
+    starting_qb[first_keys] = names[passer_codes[first_rows]]
+    starting_play_id = np.full(n_keys, np.nan)
+    starting_play_id[first_keys] = play_ids[first_rows]
+    present[first_keys] = True
+
+    key_idx = np.flatnonzero(present)
+    team_partial = pd.DataFrame({
+        "game_id": game_ids[key_idx // n_teams],
+        "team": teams[key_idx % n_teams],
+        **{col: values[key_idx] for col, values in team_columns.items()},
+        "starting_qb": starting_qb[key_idx],
+        "starting_qb_play_id": starting_play_id[key_idx],
+    })
+
+    # --- EPA per (game, team, qb): passes, dropbacks (scrambles/sacks) and QB runs ---
+    dropback = (plays["qb_dropback"] == 1).to_numpy()
+    kind = np.select([passer_codes >= 0, dropback], [_PASS, _DROPBACK], default=_RUSH)
+    qb_codes = np.where(passer_codes >= 0, passer_codes, rusher_codes)
+    rows = (pos_key >= 0) & (qb_codes >= 0)
+
+    n_names = max(len(names), 1)
+    group = (pos_key[rows] * n_names + qb_codes[rows]) * 3 + kind[rows]
+    groups, inverse = np.unique(group, return_inverse=True)
+    epa = plays["epa"].to_numpy(dtype="float64")[rows]
+    has_epa = ~np.isnan(epa)
+    group_key, group_kind = np.divmod(groups, 3)
+    group_team_key, group_qb = np.divmod(group_key, n_names)
+
+    qb_partial = pd.DataFrame({
+        "game_id": game_ids[group_team_key // n_teams],
+        "team": teams[group_team_key % n_teams],
+        "qb_name": names[group_qb],
+        "kind": group_kind,
+        "epa_sum": np.bincount(inverse, weights=np.where(has_epa, epa, 0.0), minlength=len(groups)),
+        "epa_count": np.bincount(inverse, weights=has_epa, minlength=len(groups)),
+    })
+
+    return team_partial, qb_partial
+
+
+def _combine_partials(partials):
+    """
+    Merge partial aggregates of disjoint chunks of plays into the partials of their union.
+
+    Sums and counts add up; the starting QB is the one on the earliest pass over all
+    chunks (the first chunk's on ties, as in a single pass over the chunks in order).
+    """
+    team_parts, qb_parts = zip(*partials)
+    if len(team_parts) == 1:
+        return team_parts[0], qb_parts[0]
+
+    keys = ["game_id", "team"]
+    team = pd.concat(team_parts, ignore_index=True)
+    additive = [c for c in team.columns if c.endswith(("_sum", "_count"))]
+    team_partial = team.groupby(keys, sort=False)[additive].sum()
+    starters = (
+        team.dropna(subset=["starting_qb_play_id"])
+        .sort_values("starting_qb_play_id", kind="stable")
+        .drop_duplicates(keys)
+        .set_index(keys)[["starting_qb", "starting_qb_play_id"]]
+    )
+    team_partial = team_partial.join(starters).reset_index()
+
+    qb_partial = (
+        pd.concat(qb_parts, ignore_index=True)
+        .groupby(["game_id", "team", "qb_name", "kind"], sort=False)[["epa_sum", "epa_count"]]
+        .sum()
+        .reset_index()
+    )
+    return team_partial, qb_partial
+
+
+def _finalize(team_partial: pd.DataFrame, qb_partial: pd.DataFrame):
+    """Turn partial sums/counts into the per-game tables consumed by the feature modules."""
+    team_stats = team_partial[["game_id", "team"]].copy()
+    for name, (_, _, reducer) in TEAM_STATS.items():
+        count = team_partial[f"{name}_count"]
+        if reducer == "mean":
+            team_stats[name] = team_partial[f"{name}_sum"] / count.where(count > 0)
+        else:
+            team_stats[name] = count
+    team_stats["starting_qb"] = team_partial["starting_qb"]
+
+    # QB runs only count for players who threw a pass somewhere in the data
+    passers = qb_partial.loc[qb_partial["kind"] == _PASS, "qb_name"].unique()
+    qb_partial = qb_partial[(qb_partial["kind"] != _RUSH) | qb_partial["qb_name"].isin(passers)]
+
+    qb_stats = (
+        qb_partial
+        .groupby(["game_id", "team", "qb_name"], sort=False)[["epa_sum", "epa_count"]]
+        .sum()
+        .reset_index()
+    )
+    qb_stats["qb_avg_epa"] = qb_stats["epa_sum"] / qb_stats["epa_count"].where(qb_stats["epa_count"] > 0)
+    qb_stats = qb_stats.drop(columns=["epa_sum", "epa_count"])
+
+    return team_stats, qb_stats
+
+
+def aggregate_plays(plays: pd.DataFrame):
+    """
+    Aggregate play-by-play data into compact per-game tables in a single pass.
+
+    Parameters
+    ----------
+    plays : pd.DataFrame
+        Play-by-play dataset with the columns listed in PLAY_COLUMNS.
+
+    Returns
+    -------
+    team_stats : pd.DataFrame
+        One row per (game_id, team) with a column per TEAM_STATS entry and `starting_qb`.
+    qb_stats : pd.DataFrame
+        One row per (game_id, team, qb_name) with `qb_avg_epa`, the mean EPA over the
+        QB's passes, dropbacks and runs in that game.
+    """
+    team_stats, qb_stats = _finalize(*_partial_aggregates(plays))
+
+    print("Play-by-play aggregated to game level.")
+
+    return team_stats, qb_stats
+
+
+def aggregate_play_chunks(chunks):
+    """
+    Out-of-core `aggregate_plays`: aggregate play-by-play one chunk at a time.
+
+    Each chunk (e.g. a season, see src.load.iter_play_chunks) is reduced to its small
+    per-(game, team) and per-(game, team, QB) partials and released before the next one
+    is read, so peak memory is bounded by the largest chunk. The partials are combined
+    and finalized exactly as in `aggregate_plays` (QB runs are filtered against the
+    passers of all chunks), giving the same tables. When a game's plays are split across
+    chunks, its EPA means can differ from a single pass in the last floating-point bit
+    (sums are added in a different order); with one chunk per season they are identical.
+
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        Disjoint sets of plays with the columns listed in PLAY_COLUMNS.
+
+    Returns
+    -------
+    team_stats, qb_stats : pd.DataFrame
+        As returned by `aggregate_plays`.
+    """
+    partials = [_partial_aggregates(chunk) for chunk in chunks]
+    if not partials:
+        raise ValueError("No play-by-play chunks to aggregate.")
+    team_stats, qb_stats = _finalize(*_combine_partials(partials))
+
+    print(f"Play-by-play aggregated to game level in {len(partials)} chunks.")
+
+    return team_stats, qb_stats
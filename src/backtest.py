@@ -0,0 +1,202 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.model import FEATURES, TARGET, make_model, model_matrix
+
+# Edges (|prediction - line|) at which a bet is placed
+MARGINS = (0, 2.5, 5, 7.5)
+
+# American odds every over/under bet is priced at
+PRICE = -110
+
+# Worker process state, set once per worker by _init_worker so folds only pass row offsets
+_X = None
+_y = None
+_MODEL_PARAMS = None
+
+
+def time_ordered_matrix(team_games: pd.DataFrame) -> pd.DataFrame:
+    """The model matrix (see model.model_matrix) sorted by season and week."""
+    return model_matrix(team_games).sort_values(["season", "week", "game_id"], kind="stable").reset_index(drop=True)
+
+
+def walk_forward_folds(matrix: pd.DataFrame, step="week", start_season=None) -> list:
+    """
+    Time-ordered folds over a model matrix sorted by season and week.
+
+    Each fold tests one week (or season) and trains on every game before it, so a
+    prediction only ever uses data available before the game was played.
+
+    Returns
+    -------
+    list of (test_start, test_end)
+        Row offsets into `matrix`; the fold trains on rows[:test_start].
+    """
+    if step not in ("week", "season"):
+        raise ValueError(f"Unknown walk-forward step: {step!r} (expected 'week' or 'season')")
+
+    keys = matrix["season"] * 100 + matrix["week"] if step == "week" else matrix["season"]
+    start_season = start_season if start_season is not None else matrix["season"].min() + 1
+
+    starts = np.flatnonzero(keys.ne(keys.shift()).to_numpy())
+    ends = np.append(starts[1:], len(matrix))
+    return [
+        (int(start), int(end))
+        for start, end in zip(starts, ends)
+        if matrix["season"].iat[start] >= start_season and start > 0
+    ]
+
+
+def _init_worker(X, y, model_params):
+    global _X, _y, _MODEL_PARAMS
+    _X, _y, _MODEL_PARAMS = X, y, model_params
+
+
+def _run_fold(fold):
+    test_start, test_end = fold
+    model = make_model(**_MODEL_PARAMS)
+    model.fit(_X[:test_start], _y[:test_start])
+    return model.predict(_X[test_start:test_end])
+
+
+def bet_results(ledger: pd.DataFrame, margin: float, price=PRICE) -> dict:
+    """
+    Over/under results of betting every game where the prediction beats the line by more than `margin`.
+
+    Pushes (final total equal to the line) are refunded and left out of the hit rate.
+    """
+    edge = ledger["prediction"] - ledger["total_line"]
+    over = edge > margin
+    under = edge < -margin
+    bets = over | under
+
+    actual = ledger[TARGET] - ledger["total_line"]
+    push = bets & (actual == 0)
+    won = (over & (actual > 0)) | (under & (actual < 0))
+    lost = bets & ~won & ~push
+
+    payout = 100 / -price if price < 0 else price / 100
+    profit = won.sum() * payout - lost.sum()
+    decided = int(won.sum() + lost.sum())
+
+    return {
+        "margin": margin,
+        "bets": int(bets.sum()),
+        "wins": int(won.sum()),
+        "losses": int(lost.sum()),
+        "pushes": int(push.sum()),
+        "hit_rate": won.sum() / decided if decided else None,
+        "roi": profit / bets.sum() if bets.sum() else None,
+    }
+
+
+def summarize(ledger: pd.DataFrame, margins=MARGINS, price=PRICE) -> dict:
+    """MAE of the ledger and its betting results at each margin."""
+    return {
+        "games": len(ledger),
+        "MAE": float((ledger["prediction"] - ledger[TARGET]).abs().mean()),
+        "Vegas MAE": float((ledger["total_line"] - ledger[TARGET]).abs().mean()),
+        "bets": pd.DataFrame([bet_results(ledger, m, price) for m in margins]),
+    }
+
+
+def run_backtest(
+    team_games: pd.DataFrame,
+    step="week",
+    start_season=None,
+    margins=MARGINS,
+    random_state=42,
+    workers=None,
+    ledger_path=None,
+    **model_params,
+):
+    """
+    Walk-forward backtest: retrain before every week (or season) on all earlier games.
+
+    The model matrix is built once and handed to each worker process once; folds are
+    then dispatched as row offsets, so no feature is re-derived or re-sent per fold.
+
+    Parameters
+    ----------
+    team_games : pd.DataFrame
+        Team-game level dataset, e.g. from `build_team_games()`.
+    step : str
+        'week' or 'season': how much is predicted between retrains.
+    start_season : int, optional
+        First season to predict. Defaults to the second season in the data.
+    margins : iterable of float
+        Edges at which betting hit rate and ROI are reported.
+    random_state : int
+        Random seed for every fold's model.
+    workers : int, optional
+        Worker processes (default: one per core).
+    ledger_path : str, optional
+        Where to save the per-game ledger as parquet.
+    **model_params
+        Overrides of model.MODEL_PARAMS.
+
+    Returns
+    -------
+    ledger : pd.DataFrame
+        One row per predicted game: game_id, season, week, total_points, total_line,
+        prediction and the number of games it was trained on.
+    summary : dict
+        MAE and per-margin bets, hit rate and ROI (see `summarize`).
+    """
+    matrix = time_ordered_matrix(team_games)
+    folds = walk_forward_folds(matrix, step, start_season)
+    if not folds:
+        raise ValueError("No walk-forward folds: need games before the first test season.")
+
+    X = matrix[FEATURES].to_numpy(dtype=np.float64)
+    y = matrix[TARGET].to_numpy(dtype=np.float64)
+
+    # Trees are built in parallel across folds, so each model stays single-threaded
+    params = {"random_state": random_state, "n_jobs": 1, **model_params}
+
+    print(f"Backtesting {len(folds)} walk-forward folds ({step} steps)...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y, params)) as pool:
+        predictions = list(pool.map(_run_fold, folds))
+
+    test_rows = np.concatenate([np.arange(start, end) for start, end in folds])
+    ledger = matrix.loc[test_rows, ["game_id", "season", "week", TARGET, "total_line"]].reset_index(drop=True)
+    ledger["prediction"] = np.concatenate(predictions)
+    ledger["train_games"] = np.concatenate([np.full(end - start, start) for start, end in folds])
+
+    if ledger_path:
+        os.makedirs(os.path.dirname(ledger_path) or ".", exist_ok=True)
+        ledger.to_parquet(ledger_path, index=False)
+
+    summary = summarize(ledger, margins)
+
+    print("Backtest complete.")
+    print(f"Games: {summary['games']}  MAE: {summary['MAE']:.2f}  Vegas MAE: {summary['Vegas MAE']:.2f}")
+    print(summary["bets"].to_string(index=False))
+
+    return ledger, summary
+
+
+if __name__ == "__main__":
+    from src.features import build_team_games
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the total points model.")
+    parser.add_argument("--step", choices=["week", "season"], default="week")
+    parser.add_argument("--start-season", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--n-estimators", type=int)
+    parser.add_argument("--ledger", default="backtests/ledger.parquet", help="Per-game ledger output path.")
+    args = parser.parse_args()
+
+    model_params = {"n_estimators": args.n_estimators} if args.n_estimators else {}
+    run_backtest(
+        build_team_games(),
+        step=args.step,
+        start_season=args.start_season,
+        workers=args.workers,
+        ledger_path=args.ledger,
+        **model_params,
+    )
@@ -1,7 +1,9 @@
 import pandas as pd
 
+from src.rolling import WINDOW, rolling_stats
+
 def create_basic_features(games):
-    """Create team-game level features from games and play-by-play data."""
+    """Create team-game level features from games (home/away columns are added by src.pivot)."""
     
     # total points scored in each game
     games['total_points'] = games['home_score'] + games['away_score']
@@ -20,25 +22,12 @@ def create_basic_features(games):
     team_games = pd.concat([home, away], ignore_index=True)
     team_games = team_games.sort_values(by=['team', 'season', 'week'])
 
-    # rolling averages for points (shift so it’s prior games only)
-    team_games['rolling_avg_points_for'] = (
-        team_games.groupby(['team', 'season'])['points_for']
-        .shift()
-        .rolling(window=5, min_periods=1)
-        .mean()
-    )
-    team_games['rolling_avg_points_against'] = (
-        team_games.groupby(['team', 'season'])['points_against']
-        .shift()
-        .rolling(window=5, min_periods=1)
-        .mean()
-    )
-
-    # assign home/away features
-    team_games['home_rolling_avg_points_for'] = team_games.groupby('game_id')['rolling_avg_points_for'].transform(lambda x: x.where(team_games['is_home']==1).max())
-    team_games['home_rolling_avg_points_against'] = team_games.groupby('game_id')['rolling_avg_points_against'].transform(lambda x: x.where(team_games['is_home']==1).max())
-    team_games['away_rolling_avg_points_for'] = team_games.groupby('game_id')['rolling_avg_points_for'].transform(lambda x: x.where(team_games['is_home']==0).max())
-    team_games['away_rolling_avg_points_against'] = team_games.groupby('game_id')['rolling_avg_points_against'].transform(lambda x: x.where(team_games['is_home']==0).max())
+    # rolling averages for points (shifted so it’s prior games only)
+    rolling = rolling_stats(team_games, ['team', 'season'], {
+        'rolling_avg_points_for': ('points_for', 'mean', WINDOW),
+        'rolling_avg_points_against': ('points_against', 'mean', WINDOW),
+    })
+    team_games[list(rolling.columns)] = rolling
 
     print("Basic football features created.")
     return team_games
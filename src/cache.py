@@ -0,0 +1,47 @@
+import os
+import pandas as pd
+
+CACHE_DIR = "data/cache"
+
+
+def read_table(path) -> pd.DataFrame:
+    """Read a cached parquet table, or an empty frame if it does not exist yet."""
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_parquet(path)
+
+
+def write_table(path, df: pd.DataFrame):
+    """Write a cached parquet table atomically."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def is_expired(fetched_at: pd.Series, ttl, now) -> pd.Series:
+    """True where an entry fetched at `fetched_at` is older than its TTL (scalar or per-entry Series)."""
+    return (now - fetched_at) > ttl
+
+
+def conditional_get(session, url, params=None, etag=None, last_modified=None, timeout=None):
+    """
+    GET with HTTP validators from a previous response.
+
+    Returns
+    -------
+    (data, etag, last_modified)
+        `data` is the parsed JSON body, or None if the server answered 304 Not Modified,
+        in which case the previous validators are returned unchanged.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    response = session.get(url, params=params, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None, etag, last_modified
+    response.raise_for_status()
+    return response.json(), response.headers.get("ETag"), response.headers.get("Last-Modified")
@@ -0,0 +1,127 @@
+from src import aggregate, basic, defense, load, pace, pivot, qb, rolling, weather
+from src.aggregate import aggregate_play_chunks, aggregate_plays
+from src.basic import create_basic_features
+from src.defense import create_defense_features
+from src.instrument import stage
+from src.load import GAMES_PATH, LEGACY_PLAYS_PATH, iter_play_chunks, load_data, load_games, play_files
+from src.pace import create_pace_features
+from src.pivot import pivot_home_away
+from src.qb import create_qb_features
+from src.store import STORE_DIR, code_version, fingerprint_files, load_stage, save_stage, stage_key
+from src.weather import create_weather_features
+
+# Feature stages in run order: name -> modules whose source code the stage output depends on
+STAGES = {
+    "basic": (basic, rolling),
+    "qb": (qb, rolling, aggregate, load),
+    "defense": (defense, rolling, aggregate, load),
+    "pace": (pace, rolling, aggregate, load),
+    "pivot": (pivot,),
+    "weather": (weather,),
+}
+
+# How each stage turns the previous stage's team_games (and the loaded data) into its output
+STAGE_FUNCTIONS = {
+    "basic": lambda team_games, data: create_basic_features(data["games"]),
+    "qb": lambda team_games, data: create_qb_features(team_games, data["team_stats"], data["qb_stats"]),
+    "defense": lambda team_games, data: create_defense_features(team_games, data["team_stats"]),
+    "pace": lambda team_games, data: create_pace_features(team_games, data["team_stats"]),
+    # the stages above add per-team columns only; their home_/away_ game columns are added here in one reshape
+    "pivot": lambda team_games, data: pivot_home_away(team_games),
+    "weather": lambda team_games, data: create_weather_features(team_games),
+}
+
+
+class _LazyData:
+    """
+    Loads games/plays and the per-game aggregates on first access, so fully cached runs skip them.
+
+    With `chunk_by` ("season" or "row_group") plays are streamed through the aggregation
+    pass one chunk at a time instead of being loaded whole (see src.load.iter_play_chunks).
+    """
+
+    def __init__(self, seasons, chunk_by=None):
+        self.seasons = seasons
+        self.chunk_by = chunk_by
+        self.tables = None
+
+    def __getitem__(self, name):
+        if self.tables is None and self.chunk_by is not None:
+            with stage("load") as s:
+                games = s.output(load_games(self.seasons))
+            with stage("aggregate") as s:
+                team_stats, qb_stats = s.output(*aggregate_play_chunks(iter_play_chunks(self.seasons, self.chunk_by)))
+            self.tables = {"games": games, "team_stats": team_stats, "qb_stats": qb_stats}
+        elif self.tables is None:
+            with stage("load") as s:
+                games, plays = s.output(*load_data(self.seasons))
+            with stage("aggregate", plays) as s:
+                team_stats, qb_stats = s.output(*aggregate_plays(plays))
+            self.tables = {"games": games, "team_stats": team_stats, "qb_stats": qb_stats}
+        return self.tables[name]
+
+
+def stage_keys(seasons=None, store_dir=STORE_DIR) -> dict:
+    """
+    Feature store key of every stage.
+
+    Each key chains the previous stage's key with the stage's code version and parameters,
+    and the first is rooted in a content hash of the games file and the play-by-play files
+    of the requested seasons, so a change to any input invalidates that stage and everything
+    downstream of it.
+    """
+    seasons = sorted(seasons) if seasons is not None else None
+    inputs = fingerprint_files([GAMES_PATH, LEGACY_PLAYS_PATH] + play_files(seasons), store_dir)
+    parent = stage_key("inputs", inputs, "", {"seasons": seasons})
+
+    keys = {}
+    for name, modules in STAGES.items():
+        params = None
+        if name == "weather":
+            params = {"weather": fingerprint_files([weather.WEATHER_STORE_PATH, weather.COVERAGE_PATH], store_dir)}
+        parent = stage_key(name, parent, code_version(*modules), params)
+        keys[name] = parent
+    return keys
+
+
+def build_team_games(seasons=None, store_dir=STORE_DIR, chunk_by=None):
+    """
+    Build the team_games feature table, reusing feature store entries where possible.
+
+    Starts from the latest stage whose output is already stored under its current key and
+    recomputes (and stores) only the stages after it.
+
+    Parameters
+    ----------
+    seasons : iterable of int, optional
+        Seasons to build features for. Defaults to every cached season.
+    store_dir : str
+        Feature store directory.
+    chunk_by : str, optional
+        "season" or "row_group" to aggregate play-by-play out of core, one chunk at a
+        time, so peak memory is bounded by one chunk rather than the whole history. The
+        output is the same either way.
+
+    Returns
+    -------
+    pd.DataFrame
+        Team-game level dataset with all feature stages applied.
+    """
+    keys = stage_keys(seasons, store_dir)
+    names = list(STAGES)
+
+    team_games, start = None, 0
+    for i in reversed(range(len(names))):
+        cached = load_stage(names[i], keys[names[i]], store_dir)
+        if cached is not None:
+            print(f"Loaded cached '{names[i]}' features from {store_dir}.")
+            team_games, start = cached, i + 1
+            break
+
+    data = _LazyData(seasons, chunk_by)
+    for name in names[start:]:
+        with stage(name, team_games) as s:
+            team_games = s.output(STAGE_FUNCTIONS[name](team_games, data))
+        save_stage(name, keys[name], team_games, store_dir)
+
+    return team_games
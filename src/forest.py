@@ -0,0 +1,142 @@
+import os
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# Array-backed export of a fitted RandomForestRegressor: all trees' nodes concatenated into
+# flat arrays, loaded without sklearn objects and evaluated for every tree at once.
+
+LEAF = -1
+
+# sklearn forest -> its CompactForest export, so repeated scoring exports each model once
+_EXPORTS = weakref.WeakKeyDictionary()
+
+
+class CompactForest:
+    """
+    A fitted random forest stored as flat node arrays.
+
+    Node i of the forest splits on `feature[i]` at `threshold[i]` (going to `left[i]` if
+    x <= threshold, else `right[i]`; missing values go left where `nan_left[i]`); leaves
+    have feature == LEAF and predict `value[i]`. `roots` holds each tree's root node.
+    """
+
+    def __init__(self, feature, threshold, left, right, nan_left, value, roots, feature_names=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.nan_left = nan_left
+        self.value = value
+        self.roots = roots
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Export a fitted sklearn RandomForestRegressor (single output)."""
+        features, thresholds, lefts, rights, nan_lefts, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            features.append(np.where(is_leaf, LEAF, tree.feature).astype(np.int32))
+            thresholds.append(tree.threshold)
+            # leaves point at themselves, so child arrays only ever hold valid node indices
+            own = np.arange(tree.node_count) + offset
+            lefts.append(np.where(is_leaf, own, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, own, tree.children_right + offset).astype(np.int32))
+            nan_lefts.append(tree.missing_go_to_left.astype(bool))
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            np.concatenate(features),
+            np.concatenate(thresholds),
+            np.concatenate(lefts),
+            np.concatenate(rights),
+            np.concatenate(nan_lefts),
+            np.concatenate(values),
+            np.array(roots, dtype=np.int32),
+            getattr(model, "feature_names_in_", None),
+        )
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def _as_array(self, X):
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names is not None:
+                X = X[self.feature_names]
+            X = X.to_numpy()
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return np.asarray(X, dtype=np.float32).astype(np.float64)
+
+    def apply(self, X):
+        """Leaf node of every sample in every tree, shape (n_samples, n_trees)."""
+        X = self._as_array(X)
+        n_samples, n_trees = len(X), len(self.roots)
+        node = np.tile(self.roots, n_samples)
+        rows = np.repeat(np.arange(n_samples), n_trees)
+
+        # step every (sample, tree) path still at a split node down one level
+        active = np.flatnonzero(self.feature[node] != LEAF)
+        while len(active):
+            current = node[active]
+            x = X[rows[active], self.feature[current]]
+            go_left = np.where(np.isnan(x), self.nan_left[current], x <= self.threshold[current])
+            node[active] = np.where(go_left, self.left[current], self.right[current])
+            active = active[self.feature[node[active]] != LEAF]
+        return node.reshape(n_samples, n_trees)
+
+    def predict_trees(self, X):
+        """Every tree's prediction, shape (n_samples, n_trees)."""
+        return self.value[self.apply(X)]
+
+    def predict(self, X):
+        """Mean prediction over trees, like RandomForestRegressor.predict."""
+        return self.predict_trees(X).mean(axis=1)
+
+    def save(self, path):
+        """Save as an uncompressed .npz archive of the node arrays (atomically, for hot reloads)."""
+        arrays = {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "nan_left": self.nan_left,
+            "value": self.value,
+            "roots": self.roots,
+        }
+        if self.feature_names is not None:
+            arrays["feature_names"] = np.array(self.feature_names)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            names = arrays["feature_names"] if "feature_names" in arrays else None
+            return cls(
+                arrays["feature"],
+                arrays["threshold"],
+                arrays["left"],
+                arrays["right"],
+                arrays["nan_left"],
+                arrays["value"],
+                arrays["roots"],
+                names,
+            )
+
+
+def as_compact(model) -> CompactForest:
+    """The model itself if it is a CompactForest, else its (cached) export."""
+    if isinstance(model, CompactForest):
+        return model
+    if model not in _EXPORTS:
+        _EXPORTS[model] = CompactForest.from_sklearn(model)
+    return _EXPORTS[model]
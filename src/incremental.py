@@ -0,0 +1,162 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from src.aggregate import aggregate_plays
+from src.features import STAGE_FUNCTIONS, STAGES, build_team_games, stage_keys
+from src.load import GAMES_PATH, PLAYS_DIR, compact_play_dtypes, load_data, required_play_columns, season_partition
+from src.rolling import WINDOW
+from src.store import STORE_DIR, load_stage, save_stage
+
+# Rolling state tables stored next to team_games in the feature store, keyed by its stage key
+STATE_TABLES = ("games", "team_stats", "qb_stats")
+
+
+def _completed(games: pd.DataFrame) -> pd.Series:
+    """Games that have a final score (the schedule also lists games not yet played)."""
+    return games["home_score"].notna() & games["away_score"].notna()
+
+
+def _recent_game_ids(games: pd.DataFrame, window: int) -> set:
+    """Game ids of each team's last `window` completed games."""
+    games = games[_completed(games)]
+    appearances = pd.concat([
+        games[["game_id", "season", "week", "home_team"]].rename(columns={"home_team": "team"}),
+        games[["game_id", "season", "week", "away_team"]].rename(columns={"away_team": "team"}),
+    ])
+    recent = appearances.sort_values(["season", "week"]).groupby("team").tail(window)
+    return set(recent["game_id"])
+
+
+def rolling_state(games, team_stats, qb_stats, window=WINDOW) -> dict:
+    """
+    The history every rolling feature needs to extend to new games.
+
+    Holds the last `window` completed games of every team (games rows and their per-game
+    aggregates) and the last `window` appearances of every QB. Rolling windows never look
+    further back, so running the feature stages over this state plus new games reproduces a
+    full rebuild for the new rows.
+    """
+    recent = _recent_game_ids(games, window)
+    return {
+        "games": games[games["game_id"].isin(recent)],
+        "team_stats": team_stats[team_stats["game_id"].isin(recent)],
+        "qb_stats": qb_stats.sort_values("game_id").groupby("qb_name").tail(window),
+    }
+
+
+def load_rolling_state(key: str, store_dir=STORE_DIR):
+    """Load the rolling state saved under a team_games key, or None if any table is missing."""
+    state = {name: load_stage(f"state_{name}", key, store_dir) for name in STATE_TABLES}
+    if any(table is None for table in state.values()):
+        return None
+    return state
+
+
+def save_rolling_state(key: str, state: dict, store_dir=STORE_DIR):
+    for name in STATE_TABLES:
+        save_stage(f"state_{name}", key, state[name].reset_index(drop=True), store_dir)
+
+
+def append_games(new_games: pd.DataFrame, path=GAMES_PATH):
+    """Add new games to the games file, replacing any earlier rows with the same game_id."""
+    games = pd.read_parquet(path)
+    games = games[~games["game_id"].isin(new_games["game_id"])]
+    pd.concat([games, new_games], ignore_index=True).to_parquet(path, index=False)
+
+
+def append_plays(new_plays: pd.DataFrame, plays_dir=PLAYS_DIR):
+    """Write new plays as extra part files in their season partitions instead of rewriting a season."""
+    stamp = f"{datetime.now():%Y%m%d%H%M%S%f}"
+    paths = []
+    for season, plays in new_plays.groupby("season"):
+        partition = season_partition(int(season), plays_dir)
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, f"part-{stamp}.parquet")
+        tmp_path = os.path.join(partition, f".part-{stamp}.parquet.tmp")
+        plays.drop(columns=["season"]).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+def update_team_games(new_games: pd.DataFrame, new_plays: pd.DataFrame, store_dir=STORE_DIR) -> pd.DataFrame:
+    """
+    Add a batch of completed games to the stored data and features without a full rebuild.
+
+    New games and plays are appended to the data directory. Rolling features are computed
+    for the new games only, by running the feature stages over the saved rolling state
+    (each team's and QB's last games) plus the new games. Games of the schedule that are
+    still unplayed are recomputed too, since their features look back on the new games;
+    a new game's earlier unscored row is replaced. The result replaces the stored
+    team_games, so the next `build_team_games()` call loads it straight from the store.
+
+    Parameters
+    ----------
+    new_games : pd.DataFrame
+        Schedule rows (games.parquet schema). Games without a final score, or already
+        in team_games with one, are ignored.
+    new_plays : pd.DataFrame
+        Play-by-play rows for the new games (nflverse play-by-play schema, including season).
+    store_dir : str
+        Feature store directory.
+
+    Returns
+    -------
+    pd.DataFrame
+        The updated team_games.
+    """
+    final_stage = list(STAGES)[-1]
+    key = stage_keys(store_dir=store_dir)[final_stage]
+
+    team_games = load_stage(final_stage, key, store_dir)
+    if team_games is None:
+        team_games = build_team_games(store_dir=store_dir)
+
+    state = load_rolling_state(key, store_dir)
+    if state is None:
+        games, plays = load_data()
+        state = rolling_state(games, *aggregate_plays(plays))
+
+    scored = team_games.loc[team_games["points_for"].notna(), "game_id"]
+    new_games = new_games[_completed(new_games) & ~new_games["game_id"].isin(scored)]
+    if new_games.empty:
+        print("No new completed games to add.")
+        return team_games
+    new_plays = new_plays[new_plays["game_id"].isin(new_games["game_id"])]
+
+    append_games(new_games)
+    append_plays(new_plays)
+    games = pd.read_parquet(GAMES_PATH)
+    unplayed = games[~_completed(games)]
+
+    # Run every feature stage over the saved history plus the new and unplayed games only
+    new_team_stats, new_qb_stats = aggregate_plays(compact_play_dtypes(new_plays[required_play_columns()]))
+    history = state["games"][~state["games"]["game_id"].isin(new_games["game_id"])]
+    data = {
+        "games": pd.concat([history, new_games, unplayed], ignore_index=True),
+        "team_stats": pd.concat([state["team_stats"], new_team_stats], ignore_index=True),
+        "qb_stats": pd.concat([state["qb_stats"], new_qb_stats], ignore_index=True),
+    }
+    delta = None
+    for name in STAGES:
+        delta = STAGE_FUNCTIONS[name](delta, data)
+    recomputed = pd.concat([new_games["game_id"], unplayed["game_id"]])
+    delta = delta[delta["game_id"].isin(recomputed)]
+
+    # the rows being recomputed (unscored until now) are replaced, not duplicated
+    team_games = team_games[~team_games["game_id"].isin(recomputed)]
+    team_games = (
+        pd.concat([team_games, delta], ignore_index=True)
+        .sort_values(["team", "season", "week"])
+        .reset_index(drop=True)
+    )
+
+    new_key = stage_keys(store_dir=store_dir)[final_stage]
+    save_stage(final_stage, new_key, team_games, store_dir)
+    save_rolling_state(new_key, rolling_state(data["games"], data["team_stats"], data["qb_stats"]), store_dir)
+
+    print(f"Added {len(new_games)} new games to team_games.")
+
+    return team_games
@@ -0,0 +1,208 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is then reported as None
+    resource = None
+
+# Profiling modes for the single stage selected with `run_report(profile_stage=...)`
+PROFILE_MODES = ("cpu", "memory")
+
+# Functions / allocation sites kept in the report for the profiled stage
+PROFILE_TOP = 25
+
+# The report stages record into while a `run_report` block is active
+_active = None
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes on Linux
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+def describe(obj):
+    """Shape of a stage input or output: {"rows", "columns"} per DataFrame, in the same structure."""
+    if isinstance(obj, pd.DataFrame):
+        return {"rows": len(obj), "columns": obj.shape[1]}
+    if isinstance(obj, pd.Series):
+        return {"rows": len(obj), "columns": 1}
+    if isinstance(obj, (tuple, list)):
+        shapes = [describe(o) for o in obj]
+        return shapes if any(s is not None for s in shapes) else None
+    if isinstance(obj, dict):
+        shapes = {k: describe(v) for k, v in obj.items()}
+        return {k: s for k, s in shapes.items() if s is not None} or None
+    return None
+
+
+class Stage:
+    """Measurements of one stage; call `output(...)` with the stage's result to record its shape."""
+
+    def __init__(self, name, inputs):
+        self.record = {"stage": name, "inputs": describe(list(inputs)) if inputs else None, "outputs": None}
+
+    def output(self, *outputs):
+        self.record["outputs"] = describe(list(outputs))
+        return outputs[0] if len(outputs) == 1 else outputs
+
+
+class RunReport:
+    """Stage records of one pipeline run, written as a JSON run report."""
+
+    def __init__(self, profile_stage=None, profile_mode="cpu"):
+        if profile_mode not in PROFILE_MODES:
+            raise ValueError(f"profile_mode must be one of {PROFILE_MODES}, got {profile_mode!r}")
+        self.profile_stage = profile_stage
+        self.profile_mode = profile_mode
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.stages = []
+        self.profile = None
+
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": round(time.perf_counter() - self.started, 4),
+            "argv": sys.argv,
+            "stages": self.stages,
+            "profile": self.profile,
+        }
+
+    def save(self, path):
+        """Write the report as JSON (atomically)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        print(f"Saved run report to {path}")
+
+    def summary(self) -> pd.DataFrame:
+        """One row per stage: timings, peak RSS delta and output rows."""
+        rows = []
+        for record in self.stages:
+            outputs = record["outputs"] or []
+            rows.append({
+                "stage": "  " * record["depth"] + record["stage"],
+                "wall_s": record["wall_seconds"],
+                "cpu_s": record["cpu_seconds"],
+                "peak_rss_delta_mb": record["peak_rss_delta_mb"],
+                "output_rows": outputs[0].get("rows") if outputs and isinstance(outputs[0], dict) else None,
+            })
+        return pd.DataFrame(rows)
+
+
+@contextmanager
+def run_report(profile_stage=None, profile_mode="cpu"):
+    """
+    Collect every `stage` entered inside the block into a RunReport.
+
+    Parameters
+    ----------
+    profile_stage : str, optional
+        Name of one stage to profile: with cProfile (profile_mode="cpu") or tracemalloc
+        (profile_mode="memory"). Its top functions or allocation sites go into the report.
+    profile_mode : str
+        "cpu" or "memory".
+    """
+    global _active
+    previous, _active = _active, RunReport(profile_stage, profile_mode)
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+def _cpu_profile(profiler):
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    top = []
+    for (filename, line, function), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        top.append({
+            "function": f"{os.path.relpath(filename) if os.path.isabs(filename) else filename}:{line}({function})",
+            "ncalls": ncalls,
+            "tottime": round(tottime, 4),
+            "cumtime": round(cumtime, 4),
+        })
+    return sorted(top, key=lambda entry: entry["cumtime"], reverse=True)[:PROFILE_TOP]
+
+
+def _memory_profile(snapshot, peak):
+    return {
+        "traced_peak_mb": round(peak / (1 << 20), 2),
+        "top": [
+            {"site": str(stat.traceback), "size_mb": round(stat.size / (1 << 20), 3), "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:PROFILE_TOP]
+        ],
+    }
+
+
+@contextmanager
+def stage(name, *inputs):
+    """
+    Time a pipeline stage and record it in the active run report.
+
+    Records wall and CPU time, the increase in the process's peak RSS and the row and
+    column counts of `inputs` and of whatever is passed to the yielded Stage's `output`.
+    Stages can nest (a nested stage's time is included in its parent's). Outside a
+    `run_report` block the stage runs unrecorded.
+
+    Example
+    -------
+    with stage("totals") as s:
+        totals = s.output(get_totals())
+    """
+    report = _active
+    current = Stage(name, inputs)
+    if report is None:
+        yield current
+        return
+
+    profiling = report.profile_stage == name
+    profiler = None
+    if profiling and report.profile_mode == "cpu":
+        profiler = cProfile.Profile()
+    elif profiling:
+        tracemalloc.start()
+
+    # stages still open (not yet timed) are this one's parents
+    current.record["depth"] = sum(1 for record in report.stages if "wall_seconds" not in record)
+    report.stages.append(current.record)
+    rss_before = _peak_rss_mb()
+    wall, cpu = time.perf_counter(), time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield current
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        rss_after = _peak_rss_mb()
+        current.record.update({
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(cpu, 4),
+            "peak_rss_delta_mb": round(rss_after - rss_before, 2) if rss_before is not None else None,
+        })
+        if profiler is not None:
+            report.profile = {"stage": name, "mode": "cpu", "top": _cpu_profile(profiler)}
+        elif profiling:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            report.profile = {"stage": name, "mode": "memory", **_memory_profile(snapshot, peak)}
+        print(f"[{name}] {wall:.2f}s wall, {cpu:.2f}s cpu")
@@ -0,0 +1,200 @@
+import argparse
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from src.scoring import score
+from src.service import PredictionState
+from src.totals import API_KEY, get_totals_from_api
+from src.upcoming import slate_games
+from src.weather_forecast import get_forecasted_weather
+
+# Every odds snapshot, appended as one small part file per poll, partitioned by UTC day:
+# data/line_history/date=YYYY-MM-DD/part-<timestamp>.parquet
+LINE_HISTORY_DIR = "data/line_history"
+
+# A game is identified across snapshots by this key
+LINE_KEY = ["home_team", "away_team", "commence_time"]
+
+POLL_SECONDS = 60
+
+# Failed polls are retried after poll_seconds * 2**failures, up to this many seconds
+MAX_BACKOFF_SECONDS = 900
+
+
+def normalize_snapshot(totals: pd.DataFrame, fetched_at) -> pd.DataFrame:
+    """Odds snapshot in line-history form: UTC kickoff, float32 lines, categorical names."""
+    snapshot = pd.DataFrame({
+        "fetched_at": pd.Series(fetched_at, index=totals.index).astype("datetime64[us, UTC]"),
+        "home_team": totals["home_team"].astype("category"),
+        "away_team": totals["away_team"].astype("category"),
+        "commence_time": pd.to_datetime(totals["commence_time"], utc=True).astype("datetime64[us, UTC]"),
+        "total_line": totals["total_line"].astype("float32"),
+        "bookmaker": totals["bookmaker"].astype("category"),
+    })
+    return snapshot.reset_index(drop=True)
+
+
+def append_line_history(snapshot: pd.DataFrame, history_dir=LINE_HISTORY_DIR):
+    """Append one snapshot to the line history as its own part file."""
+    fetched_at = snapshot["fetched_at"].iloc[0] if len(snapshot) else pd.Timestamp.now(tz="UTC")
+    partition = os.path.join(history_dir, f"date={fetched_at:%Y-%m-%d}")
+    os.makedirs(partition, exist_ok=True)
+    path = os.path.join(partition, f"part-{fetched_at:%Y%m%d%H%M%S%f}.parquet")
+    tmp_path = os.path.join(partition, f".part-{fetched_at:%Y%m%d%H%M%S%f}.parquet.tmp")
+    snapshot.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _history_files(history_dir=LINE_HISTORY_DIR, start=None, end=None):
+    if not os.path.isdir(history_dir):
+        return []
+    files = []
+    for name in sorted(os.listdir(history_dir)):
+        day = name.split("=", 1)[-1]
+        if not name.startswith("date=") or (start and day < start) or (end and day > end):
+            continue
+        partition = os.path.join(history_dir, name)
+        files += [
+            os.path.join(partition, f)
+            for f in sorted(os.listdir(partition))
+            if f.endswith(".parquet") and not f.startswith(".")
+        ]
+    return files
+
+
+def read_line_history(history_dir=LINE_HISTORY_DIR, start=None, end=None) -> pd.DataFrame:
+    """
+    Line history between two UTC days ('YYYY-MM-DD', inclusive); only those partitions are read.
+    """
+    files = _history_files(history_dir, start, end)
+    if not files:
+        return pd.DataFrame(columns=["fetched_at"] + LINE_KEY + ["total_line", "bookmaker"])
+    return pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+
+
+def latest_snapshot(history_dir=LINE_HISTORY_DIR):
+    """The most recently stored snapshot, or None."""
+    files = _history_files(history_dir)
+    return pd.read_parquet(files[-1]) if files else None
+
+
+def _keys(snapshot: pd.DataFrame) -> pd.DataFrame:
+    keys = snapshot[LINE_KEY].copy()
+    for col in ("home_team", "away_team"):
+        keys[col] = keys[col].astype(str)
+    return keys
+
+
+def line_changes(previous: pd.DataFrame, current: pd.DataFrame) -> pd.DataFrame:
+    """
+    Games in `current` that are new or whose total_line differs from `previous`.
+
+    Returns the changed rows of `current` with the earlier line as previous_line
+    (NaN for new games).
+    """
+    if previous is None or previous.empty:
+        return current.assign(previous_line=float("nan"))
+    earlier = _keys(previous).assign(previous_line=previous["total_line"].to_numpy()).drop_duplicates(LINE_KEY, keep="last")
+    previous_line = _keys(current).merge(earlier, on=LINE_KEY, how="left")["previous_line"].to_numpy()
+    changed = pd.isna(previous_line) | (current["total_line"].to_numpy() != previous_line)
+    return current[changed].assign(previous_line=previous_line[changed])
+
+
+def rescore(changed: pd.DataFrame, state: PredictionState, weather=get_forecasted_weather) -> pd.DataFrame:
+    """Feature assembly and scoring for the changed games only."""
+    games = changed[LINE_KEY + ["total_line", "previous_line"]].copy()
+    games["commence_time"] = games["commence_time"].dt.tz_convert("US/Eastern")
+    for col in ("home_team", "away_team"):
+        games[col] = games[col].astype(str)
+
+    scored = slate_games(games, weather(games))
+    state.refresh()
+    scored = scored.assign(previous_line=games["previous_line"].to_numpy())
+    return score(scored, state.team_state, state.model, distribution=True)
+
+
+def poll_once(previous, state, api_key=API_KEY, validators=(None, None),
+              fetch=get_totals_from_api, weather=get_forecasted_weather,
+              history_dir=LINE_HISTORY_DIR, now=None):
+    """
+    Fetch one odds snapshot, store it and rescore the games whose line moved.
+
+    Returns
+    -------
+    (snapshot, rescored, validators)
+        `snapshot` is the latest known snapshot (the previous one if the API answered
+        304 Not Modified), `rescored` the scored changed games (empty if none moved).
+    """
+    now = now if now is not None else pd.Timestamp.now(tz="UTC")
+    totals, etag, last_modified = fetch(api_key, etag=validators[0], last_modified=validators[1])
+    if totals is None:
+        return previous, pd.DataFrame(), (etag, last_modified)
+
+    snapshot = normalize_snapshot(totals, now)
+    append_line_history(snapshot, history_dir)
+
+    changed = line_changes(previous, snapshot)
+    rescored = rescore(changed, state, weather) if not changed.empty else pd.DataFrame()
+    return snapshot, rescored, (etag, last_modified)
+
+
+def monitor_lines(poll_seconds=POLL_SECONDS, on_change=None, history_dir=LINE_HISTORY_DIR, max_polls=None):
+    """
+    Poll the odds API and rescore games as their lines move.
+
+    Each poll is a conditional request; the snapshot is appended to the line history and
+    diffed against the previous one (on start, the latest stored snapshot), and only games
+    that are new or whose total_line moved go through feature assembly and scoring. Model
+    and team state stay in memory and are reloaded when a new pipeline run replaces them.
+
+    A failed poll (timeout, HTTP error, bad payload, scoring error) is logged and retried
+    with exponential backoff; the previous snapshot and validators are kept, so the next
+    successful poll diffs against the last snapshot that was fully processed.
+
+    Parameters
+    ----------
+    poll_seconds : float
+        Seconds between polls.
+    on_change : callable, optional
+        on_change(rescored) for every poll with moved lines; prints them by default.
+    max_polls : int, optional
+        Stop after this many polls (default: run until interrupted).
+    """
+    on_change = on_change or (lambda rescored: print(rescored[
+        ["date", "home_team", "away_team", "previous_line", "total_line", "predicted_total", "p_over"]
+    ].to_string(index=False)))
+
+    state = PredictionState()
+    previous = latest_snapshot(history_dir)
+    validators = (None, None)
+
+    polls, failures = 0, 0
+    while max_polls is None or polls < max_polls:
+        started = time.perf_counter()
+        try:
+            snapshot, rescored, new_validators = poll_once(previous, state, validators=validators, history_dir=history_dir)
+            if not rescored.empty:
+                print(f"{datetime.now():%H:%M:%S} {len(rescored)} line moves rescored in {time.perf_counter() - started:.2f}s")
+                on_change(rescored)
+        except Exception as e:
+            failures += 1
+            delay = min(poll_seconds * 2 ** failures, MAX_BACKOFF_SECONDS)
+            print(f"[ERROR] {datetime.now():%H:%M:%S} poll failed ({type(e).__name__}: {e}); retrying in {delay:.0f}s")
+        else:
+            previous, validators, failures = snapshot, new_validators, 0
+            delay = poll_seconds
+        polls += 1
+        if max_polls is None or polls < max_polls:
+            time.sleep(delay)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rescore games as their totals move.")
+    parser.add_argument("--interval", type=float, default=POLL_SECONDS, help="Seconds between polls.")
+    args = parser.parse_args()
+
+    monitor_lines(args.interval)
@@ -1,24 +1,220 @@
 import os
 import pandas as pd
+import pyarrow.parquet as pq
 
-import os
-import pandas as pd
+from src import aggregate
+
+GAMES_PATH = "data/games.parquet"
+# Play-by-play, Hive-partitioned by season: data/plays/season=YYYY/*.parquet
+PLAYS_DIR = "data/plays"
+# Single-file play-by-play written by older versions of the download script; still read for seasons without a partition
+LEGACY_PLAYS_PATH = "data/plays.parquet"
+
+# Units a chunked read hands to the aggregation pass one at a time (see `iter_play_chunks`)
+CHUNK_BY = ("season", "row_group")
+
+# Columns that share one categorical dtype so they can be compared/filled against each other
+TEAM_COLUMNS = ["posteam", "defteam"]
+PLAYER_COLUMNS = ["passer_player_name", "rusher_player_name"]
+
+
+def required_play_columns():
+    """Play-by-play columns read by the aggregation pass that feeds every play-level feature."""
+    return list(aggregate.PLAY_COLUMNS)
+
+
+def season_partition(season, plays_dir=PLAYS_DIR):
+    return os.path.join(plays_dir, f"season={season}")
+
+
+def partition_seasons(plays_dir=PLAYS_DIR):
+    """Seasons that have a partition in the play-by-play directory."""
+    if not os.path.isdir(plays_dir):
+        return []
+    return sorted(
+        int(name.split("=", 1)[1])
+        for name in os.listdir(plays_dir)
+        if name.startswith("season=")
+    )
+
+
+def legacy_play_filters(seasons=None, plays_dir=PLAYS_DIR):
+    """
+    Read filters for the legacy single plays file.
+
+    Only seasons without partition files are read from it: checkouts that downloaded
+    partitions still have the old file, and its plays must not be counted twice.
+    """
+    partitioned = [season for season in partition_seasons(plays_dir) if play_files([season], plays_dir)]
+    filters = []
+    if seasons is not None:
+        filters.append(("season", "in", sorted(seasons)))
+    if partitioned:
+        filters.append(("season", "not in", partitioned))
+    return filters or None
+
+
+def play_files(seasons=None, plays_dir=PLAYS_DIR):
+    """
+    Play-by-play files a run needs to read.
+
+    Only the partitions of the requested seasons are listed; within a partition the
+    full-season file comes first, followed by part files added by incremental updates.
+    Hidden/underscore files (in-progress writes, completion markers) are skipped.
+    """
+    seasons = partition_seasons(plays_dir) if seasons is None else sorted(seasons)
+    files = []
+    for season in seasons:
+        partition = season_partition(season, plays_dir)
+        if not os.path.isdir(partition):
+            continue
+        files += sorted(
+            os.path.join(partition, name)
+            for name in os.listdir(partition)
+            if name.endswith(".parquet") and not name.startswith((".", "_"))
+        )
+    return files
+
+
+def compact_play_dtypes(plays: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcast play-by-play columns to compact dtypes.
+
+    Team codes and player names become categoricals (one shared dtype per group, so
+    e.g. passer and rusher names can still be filled from one another), game_id and
+    play_type become categoricals and EPA becomes float32.
+    """
+    plays = plays.copy()
 
-def load_data():
-    """Load cached NFL game-level and play-by-play data from CSV files in the data directory."""
-    
-    games_path = "data/games.parquet"
-    plays_path = "data/plays.parquet"
+    for group in (TEAM_COLUMNS, PLAYER_COLUMNS):
+        cols = [c for c in group if c in plays.columns]
+        if not cols:
+            continue
+        categories = pd.unique(pd.concat([plays[c] for c in cols]).dropna())
+        dtype = pd.CategoricalDtype(sorted(categories))
+        for col in cols:
+            plays[col] = plays[col].astype(dtype)
 
-    if not os.path.exists(games_path) or not os.path.exists(plays_path):
+    for col in ["game_id", "play_type"]:
+        if col in plays.columns:
+            plays[col] = plays[col].astype("category")
+
+    for col in ["epa", "qb_dropback"]:
+        if col in plays.columns:
+            plays[col] = plays[col].astype("float32")
+
+    return plays
+
+
+def _check_data():
+    has_plays = os.path.exists(LEGACY_PLAYS_PATH) or partition_seasons()
+    if not os.path.exists(GAMES_PATH) or not has_plays:
         raise FileNotFoundError(
-            "Data files not found. Please run the data download script first to generate games.csv and plays.csv in the data directory."
+            "Data files not found. Please run the data download script first to generate games.parquet and the plays/ partitions in the data directory."
         )
 
-    print(f"Reading cached historical game-level data from {games_path}...")
-    games = pd.read_parquet(games_path)
 
-    print(f"Reading cached historical play-level data from {plays_path}...")
-    plays = pd.read_parquet(plays_path)
+def load_games(seasons=None) -> pd.DataFrame:
+    """Cached game-level data, optionally for some seasons only."""
+    filters = [("season", "in", sorted(seasons))] if seasons is not None else None
+    print(f"Reading cached historical game-level data from {GAMES_PATH}...")
+    return pd.read_parquet(GAMES_PATH, filters=filters)
+
+
+def load_data(seasons=None, prune=True):
+    """
+    Load cached NFL game-level and play-by-play data from parquet files in the data directory.
+
+    Parameters
+    ----------
+    seasons : iterable of int, optional
+        Seasons to load. Only those seasons' play-by-play partitions are opened (and
+        a legacy single plays.parquet is filtered at read time), so other seasons
+        are never materialized. Defaults to every cached season. The legacy file is
+        only read for seasons that have no partition (see `legacy_play_filters`).
+    prune : bool
+        If True, read only the play-by-play columns required by the aggregation pass
+        (see `required_play_columns`) and downcast them with `compact_play_dtypes`.
+        If False, read every play-by-play column with its stored dtype.
+
+    Returns
+    -------
+    games, plays : pd.DataFrame
+    """
+
+    _check_data()
+
+    games = load_games(seasons)
+
+    print(f"Reading cached historical play-level data from {PLAYS_DIR}...")
+    columns = required_play_columns() if prune else None
+    frames = [pd.read_parquet(path, columns=columns) for path in play_files(seasons)]
+    if os.path.exists(LEGACY_PLAYS_PATH):
+        filters = legacy_play_filters(seasons)
+        frames.insert(0, pd.read_parquet(LEGACY_PLAYS_PATH, columns=columns, filters=filters))
+    plays = pd.concat(frames, ignore_index=True)
+    if prune:
+        plays = compact_play_dtypes(plays)
 
     return games, plays
+
+
+def _legacy_seasons(seasons):
+    """Seasons to read from the legacy single file: the requested ones that have no partition."""
+    legacy_seasons = pd.read_parquet(LEGACY_PLAYS_PATH, columns=["season"], filters=legacy_play_filters(seasons))
+    return sorted(legacy_seasons["season"].unique())
+
+
+def _legacy_row_groups(seasons, columns):
+    """Row groups of the legacy single file, restricted to `seasons`."""
+    legacy = pq.ParquetFile(LEGACY_PLAYS_PATH)
+    for i in range(legacy.num_row_groups):
+        chunk = legacy.read_row_group(i, columns=columns + ["season"]).to_pandas()
+        chunk = chunk[chunk["season"].isin(seasons)]
+        yield chunk.drop(columns="season").reset_index(drop=True)
+
+
+def iter_play_chunks(seasons=None, by="season"):
+    """
+    Play-by-play in chunks of one season or one parquet row group, for out-of-core aggregation.
+
+    Chunks have the pruned, compact columns of `load_data(prune=True)` and come in the
+    same order as its rows (legacy file first, then the partitions), so aggregating them
+    with `src.aggregate.aggregate_play_chunks` matches aggregating the loaded plays. Only
+    one chunk is in memory at a time.
+
+    Parameters
+    ----------
+    seasons : iterable of int, optional
+        Seasons to read (default: every cached season).
+    by : str
+        "season": one chunk per season (every play of a game is in the same chunk).
+        "row_group": one chunk per row group of each file, for when a single season
+        does not fit in memory.
+    """
+    if by not in CHUNK_BY:
+        raise ValueError(f"by must be one of {CHUNK_BY}, got {by!r}")
+    _check_data()
+    seasons = sorted(seasons) if seasons is not None else None
+    columns = required_play_columns()
+
+    print(f"Streaming cached historical play-level data from {PLAYS_DIR} by {by}...")
+    legacy_seasons = _legacy_seasons(seasons) if os.path.exists(LEGACY_PLAYS_PATH) else []
+    if by == "row_group":
+        if legacy_seasons:
+            for chunk in _legacy_row_groups(legacy_seasons, columns):
+                yield compact_play_dtypes(chunk)
+        for path in play_files(seasons):
+            parquet = pq.ParquetFile(path)
+            for i in range(parquet.num_row_groups):
+                yield compact_play_dtypes(parquet.read_row_group(i, columns=columns).to_pandas())
+        return
+
+    for season in legacy_seasons:
+        chunk = pd.read_parquet(LEGACY_PLAYS_PATH, columns=columns, filters=[("season", "==", season)])
+        yield compact_play_dtypes(chunk)
+    for season in (seasons if seasons is not None else partition_seasons()):
+        files = play_files([season])
+        if files:
+            chunk = pd.concat([pd.read_parquet(path, columns=columns) for path in files], ignore_index=True)
+            yield compact_play_dtypes(chunk)
@@ -1,9 +1,190 @@
+import hashlib
+import json
+import os
+from datetime import datetime
 import joblib
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 
+from src.forest import CompactForest
+
+# Features for prediction
+FEATURES = [
+    "total_line", # Vegas total for benchmarking
+    "home_rolling_avg_points_for",
+    "home_rolling_avg_points_against",
+    "away_rolling_avg_points_for",
+    "away_rolling_avg_points_against",
+    "home_rolling_avg_qb_epa",
+    "away_rolling_avg_qb_epa",
+    "home_rolling_avg_def_epa",
+    "away_rolling_avg_def_epa",
+    "home_temperature",
+    "home_wind_speed",
+    "home_rolling_avg_off_pace",
+    "away_rolling_avg_off_pace",
+]
+TARGET = "total_points"
+
+# RandomForestRegressor settings shared by training and backtesting.
+# max_depth / min_samples_leaf are exposed so tree size (training memory, artifact size) can be
+# capped, but are left at the sklearn defaults (unbounded trees) until a backtest shows a cap is free.
+MODEL_PARAMS = {"n_estimators": 500, "max_depth": None, "min_samples_leaf": 1}
+
+# Cores used to build trees (-1: all). A resource setting, so not part of the model fingerprint.
+N_JOBS = -1
+
+MODEL_PATH = "model/rf_total_points_model.joblib"
+# Array-backed export of the forest (see src.forest.CompactForest) for fast loading and inference
+COMPACT_MODEL_PATH = "model/rf_total_points_model.npz"
+
+# Trees added by a warm-start update when only new games were appended to the training data,
+# and the forest size past which the model is refit from scratch instead
+WARM_START_TREES = 100
+MAX_TREES = 1000
+
+
+def make_model(random_state, n_jobs=N_JOBS, **params):
+    """A RandomForestRegressor with MODEL_PARAMS, overridden by `params`."""
+    return RandomForestRegressor(**{**MODEL_PARAMS, **params}, random_state=random_state, n_jobs=n_jobs)
+
+
+def model_matrix(team_games: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per game (home team) with complete features and target.
+
+    Columns are game_id, season, week, the target and FEATURES.
+    """
+    return (
+        team_games
+        .dropna(subset=FEATURES + [TARGET])
+        .loc[lambda df: df["is_home"] == 1, ["game_id", "season", "week", TARGET] + FEATURES]
+    )
+
+
+def training_fingerprint(train_data: pd.DataFrame, params: dict) -> str:
+    """Content hash of the training rows (in order) and the model parameters."""
+    digest = hashlib.blake2b(digest_size=16)
+    rows = pd.util.hash_pandas_object(train_data[["game_id", TARGET] + FEATURES], index=False)
+    digest.update(rows.to_numpy().tobytes())
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def metadata_path(model_path):
+    """The JSON sidecar describing what a persisted model was trained on."""
+    return os.path.splitext(model_path)[0] + ".json"
+
+
+def read_metadata(model_path=MODEL_PATH):
+    """A persisted model's metadata sidecar (fingerprint, params, ...), or None if there is none."""
+    if not os.path.exists(metadata_path(model_path)):
+        return None
+    with open(metadata_path(model_path)) as f:
+        return json.load(f)
+
+
+def load_model(model_path=MODEL_PATH, mmap_mode="r"):
+    """
+    Load a persisted model and its metadata sidecar.
+
+    The joblib file is saved uncompressed so its arrays can be memory-mapped (`mmap_mode`)
+    instead of read into memory up front. Use mmap_mode=None for a model that will be
+    saved over its own file (training), since a mapped file can't be replaced on Windows.
+
+    Returns
+    -------
+    (model, metadata)
+        Both None if there is no persisted model.
+    """
+    metadata = read_metadata(model_path)
+    if not os.path.exists(model_path) or metadata is None:
+        return None, None
+    return joblib.load(model_path, mmap_mode=mmap_mode), metadata
+
+
+def save_model(model, metadata, model_path=MODEL_PATH):
+    """Persist a model and its metadata sidecar (the sidecar is written last)."""
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    tmp_path = f"{model_path}.tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, model_path)
+    with open(metadata_path(model_path), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def _can_warm_start(model, metadata, train_data, params) -> bool:
+    """True if the data only gained games since the model was trained and the old games are unchanged."""
+    if metadata is None or metadata["params"] != params or metadata["features"] != FEATURES:
+        return False
+    if model.n_estimators + WARM_START_TREES > MAX_TREES:
+        return False
+    old_ids = metadata["game_ids"]
+    if len(old_ids) >= len(train_data) or not train_data["game_id"].isin(old_ids).sum() == len(old_ids):
+        return False
+    old_rows = train_data.set_index("game_id").loc[old_ids].reset_index()
+    return training_fingerprint(old_rows, params) == metadata["fingerprint"]
+
+
+def load_compact_model(compact_path=COMPACT_MODEL_PATH):
+    """Load the array-backed export of the model, or None if it has not been exported."""
+    if not os.path.exists(compact_path):
+        return None
+    return CompactForest.load(compact_path)
+
+
+def fit_model(train_data: pd.DataFrame, model_path=MODEL_PATH, random_state=42,
+              n_jobs=N_JOBS, compact_path=None, **params):
+    """
+    Fit the model on `train_data`, reusing the persisted model where possible.
+
+    - If the persisted model was trained on exactly these rows with these parameters,
+      it is loaded and returned without training.
+    - If the training data only gained games (e.g. a new week) and the earlier games are
+      unchanged, the persisted forest is grown with `warm_start` by WARM_START_TREES trees
+      fitted on the full current data, up to MAX_TREES.
+    - Otherwise a new model is fitted from scratch.
+
+    The model is saved to `model_path` with a metadata sidecar (see `metadata_path`), and
+    exported to `compact_path` as a CompactForest if given. Trees are built on `n_jobs` cores.
+    """
+    params = {**MODEL_PARAMS, **params, "random_state": random_state}
+    fingerprint = training_fingerprint(train_data, params)
+
+    # read fully into memory: the file may be replaced below, which fails on Windows while it is mapped
+    model, metadata = load_model(model_path, mmap_mode=None)
+    if metadata is not None and metadata["fingerprint"] == fingerprint:
+        print(f"Loaded trained model from {model_path} (training data unchanged).")
+        model.set_params(n_jobs=n_jobs)
+        if compact_path and not os.path.exists(compact_path):
+            CompactForest.from_sklearn(model).save(compact_path)
+        return model
+
+    X, y = train_data[FEATURES], train_data[TARGET]
+    if _can_warm_start(model, metadata, train_data, params):
+        added = len(train_data) - len(metadata["game_ids"])
+        print(f"Adding {WARM_START_TREES} trees for {added} new games to the model from {model_path}...")
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + WARM_START_TREES, n_jobs=n_jobs)
+        model.fit(X, y)
+    else:
+        model = make_model(n_jobs=n_jobs, **params)
+        model.fit(X, y)
+
+    save_model(model, {
+        "fingerprint": fingerprint,
+        "params": params,
+        "features": FEATURES,
+        "game_ids": train_data["game_id"].tolist(),
+        "n_estimators": model.n_estimators,
+        "trained_at": datetime.now().isoformat(),
+    }, model_path)
+    if compact_path:
+        CompactForest.from_sklearn(model).save(compact_path)
+
+    return model
+
 
 def train_and_evaluate(
     team_games: pd.DataFrame,
@@ -11,7 +192,10 @@ def train_and_evaluate(
     train_seasons: list[int],
     test_seasons: list[int],
     inspection_margin: float,
-    random_state: int
+    random_state: int,
+    n_jobs: int = N_JOBS,
+    compact_path: str = None,
+    **model_params,
 ):
     """
     Train and evaluate a RandomForestRegressor to predict total points scored in NFL games.
@@ -22,7 +206,8 @@ def train_and_evaluate(
     team_games : pd.DataFrame
         Team-game level dataset (with both home/away features).
     model_path : str
-        Where to save the trained model.
+        Where to save the trained model. A model already saved there is reused (or
+        grown with warm_start) when the training data allows it, see `fit_model`.
     train_seasons : list[int]
         Seasons used for training.
     test_seasons : list[int]
@@ -31,6 +216,12 @@ def train_and_evaluate(
         Proxy for a "strong" scoring prediction relative to Vegas total, used for internal benchmarking.
     random_state : int
         Random seed for reproducibility.
+    n_jobs : int
+        Cores used to build trees (-1: all).
+    compact_path : str, optional
+        Also export the fitted forest as a CompactForest to this path.
+    **model_params
+        Overrides of MODEL_PARAMS (e.g. n_estimators, max_depth, min_samples_leaf).
 
     Returns
     -------
@@ -40,44 +231,20 @@ def train_and_evaluate(
         Evaluation metrics and betting precision.
     """
 
-    # Features for prediction
-    features = [
-        "total_line", # Vegas total for benchmarking
-        "home_rolling_avg_points_for",
-        "home_rolling_avg_points_against",
-        "away_rolling_avg_points_for",
-        "away_rolling_avg_points_against",
-        "home_rolling_avg_qb_epa",
-        "away_rolling_avg_qb_epa",
-        "home_rolling_avg_def_epa",
-        "away_rolling_avg_def_epa",
-        "home_temperature",
-        "home_wind_speed",
-        "home_rolling_avg_off_pace",
-        "away_rolling_avg_off_pace",
-    ]
+    features = FEATURES
 
     # Keep one row per game (home team)
-    model_data = (
-        team_games
-        .dropna(subset=features + ["total_points"])
-        .loc[lambda df: df["is_home"] == 1, ["game_id", "season", "week", "total_points"] + features]
-    )
+    model_data = model_matrix(team_games)
 
     # Train/test split
     train_data = model_data[model_data["season"].isin(train_seasons)]
     test_data = model_data[model_data["season"].isin(test_seasons)]
 
-    X_train, y_train = train_data[features], train_data["total_points"]
     X_test, y_test = test_data[features], test_data["total_points"]
     vegas_test = test_data["total_line"].values
 
-    # Fit model
-    model = RandomForestRegressor(n_estimators=500, random_state=random_state)
-    model.fit(X_train, y_train)
-
-    # Save trained model
-    joblib.dump(model, model_path)
+    # Fit (or load) and save model
+    model = fit_model(train_data, model_path, random_state, n_jobs=n_jobs, compact_path=compact_path, **model_params)
 
     # Feature importance
     feature_importance = pd.Series(
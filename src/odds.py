@@ -0,0 +1,125 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# One row per game x bookmaker x side of the totals market
+ODDS_COLUMNS = [
+    "fetched_at", "event_id", "home_team", "away_team", "commence_time",
+    "bookmaker", "last_update", "side", "point", "price",
+]
+
+
+def normalize_odds(payloads, market="totals") -> pd.DataFrame:
+    """
+    Flatten Odds API responses into one columnar table of every bookmaker's prices.
+
+    All payloads go through a single `pd.json_normalize` pass, so a day of snapshots
+    (hundreds of payloads) is parsed in bulk rather than walked game by game.
+
+    Parameters
+    ----------
+    payloads : list of (fetched_at, data)
+        `data` is a parsed Odds API odds response (a list of games); `fetched_at` the
+        time it was fetched (any value pandas can parse, or None).
+    market : str
+        Market key to keep.
+
+    Returns
+    -------
+    pd.DataFrame
+        ODDS_COLUMNS: side is "Over"/"Under", point the total, price American odds;
+        times are UTC and names categorical.
+    """
+    games = [
+        {**game, "fetched_at": fetched_at}
+        for fetched_at, data in payloads
+        for game in data
+        if game.get("bookmakers")
+    ]
+    meta = [
+        "fetched_at", "id", "home_team", "away_team", "commence_time",
+        ["bookmakers", "title"], ["bookmakers", "last_update"], ["bookmakers", "markets", "key"],
+    ]
+    if games:
+        rows = pd.json_normalize(games, record_path=["bookmakers", "markets", "outcomes"], meta=meta, errors="ignore")
+        rows = rows[rows["bookmakers.markets.key"] == market]
+    else:
+        rows = pd.DataFrame(columns=["name", "price", "point"] + [".".join(m) if isinstance(m, list) else m for m in meta])
+
+    odds = pd.DataFrame({
+        "fetched_at": pd.to_datetime(rows["fetched_at"], utc=True),
+        "event_id": rows["id"].astype("category"),
+        "home_team": rows["home_team"].astype("category"),
+        "away_team": rows["away_team"].astype("category"),
+        "commence_time": pd.to_datetime(rows["commence_time"], utc=True),
+        "bookmaker": rows["bookmakers.title"].astype("category"),
+        "last_update": pd.to_datetime(rows["bookmakers.last_update"], utc=True),
+        "side": rows["name"].astype("category"),
+        "point": rows["point"].astype("float32"),
+        "price": rows["price"].astype("float32"),
+    })
+    return odds.reset_index(drop=True)
+
+
+def read_payloads(paths) -> list:
+    """Recorded Odds API responses (JSON files) as (fetched_at, data) pairs for `normalize_odds`.
+
+    A file holds either a bare response or {"fetched_at": ..., "data": [...]}.
+    """
+    payloads = []
+    for path in paths:
+        with open(path) as f:
+            content = json.load(f)
+        if isinstance(content, dict):
+            payloads.append((content.get("fetched_at"), content["data"]))
+        else:
+            payloads.append((None, content))
+    return payloads
+
+
+def implied_probability(price):
+    """Implied win probability of American odds (vig included)."""
+    price = np.asarray(price, dtype=float)
+    return np.where(price < 0, -price / (100 - price), 100 / (price + 100))
+
+
+def consensus_lines(odds: pd.DataFrame) -> pd.DataFrame:
+    """
+    Market consensus per game (and snapshot): median total across books, number of books,
+    and the no-vig probability of the over at the median prices.
+    """
+    keys = ["fetched_at", "event_id", "home_team", "away_team", "commence_time"]
+    over = odds[odds["side"] == "Over"]
+    under = odds[odds["side"] == "Under"]
+
+    consensus = over.groupby(keys, observed=True, dropna=False).agg(
+        consensus_line=("point", "median"),
+        books=("bookmaker", "nunique"),
+        over_price=("price", "median"),
+    )
+    consensus["under_price"] = under.groupby(keys, observed=True, dropna=False)["price"].median()
+
+    p_over = implied_probability(consensus["over_price"])
+    p_under = implied_probability(consensus["under_price"])
+    consensus["no_vig_p_over"] = p_over / (p_over + p_under)
+    return consensus.reset_index()
+
+
+def best_lines(odds: pd.DataFrame) -> pd.DataFrame:
+    """
+    Best available line per game (and snapshot) and side: the lowest total to bet the over
+    and the highest to bet the under, ties broken by the best price.
+    """
+    keys = ["fetched_at", "event_id", "home_team", "away_team", "commence_time", "side"]
+    ranked = odds.assign(
+        # lower is better for overs, higher for unders; then higher price (payout) is better
+        rank_point=np.where(odds["side"] == "Over", odds["point"], -odds["point"]),
+        rank_price=-odds["price"],
+    ).sort_values(["rank_point", "rank_price"], kind="stable")
+    best = ranked.drop_duplicates(keys, keep="first")
+    return (
+        best[keys + ["bookmaker", "point", "price"]]
+        .sort_values(keys, kind="stable")
+        .reset_index(drop=True)
+    )
@@ -1,42 +1,28 @@
 import pandas as pd
 
-def create_pace_features(team_games: pd.DataFrame, pbp: pd.DataFrame) -> pd.DataFrame:
-    # --- build pace dataset ---
-    plays = pbp[pbp["play_type"].notna()].copy()
-
-    plays_per_game = (
-        plays.groupby(["game_id", "posteam"])
-        .size()
-        .reset_index(name="plays")
-    )
+from src.rolling import WINDOW, rolling_stats
+
+
+def create_pace_features(team_games: pd.DataFrame, team_stats: pd.DataFrame) -> pd.DataFrame:
+    # --- build pace dataset from per-(game, team) play counts ---
+    plays_per_game = team_stats.loc[team_stats["plays"] > 0, ["game_id", "team", "plays"]].copy()
 
     plays_per_game["seconds_per_play"] = 3600 / plays_per_game["plays"]
 
-    plays_per_game = plays_per_game.sort_values(["posteam", "game_id"])
+    plays_per_game = plays_per_game.sort_values(["team", "game_id"])
 
-    plays_per_game["rolling_avg_off_pace"] = (
-        plays_per_game.groupby("posteam")["seconds_per_play"]
-        .transform(lambda x: x.rolling(5, min_periods=1).mean())
-    )
+    # rolling pace over prior games only (shifted), so a game's feature never includes its own plays
+    plays_per_game["rolling_avg_off_pace"] = rolling_stats(
+        plays_per_game, "team", {"rolling_avg_off_pace": ("seconds_per_play", "mean", WINDOW)}
+    )["rolling_avg_off_pace"]
 
     # --- merge directly onto team_games ---
     team_games = team_games.merge(
-        plays_per_game[["game_id", "posteam", "seconds_per_play", "rolling_avg_off_pace"]],
-        left_on=["game_id", "team"],
-        right_on=["game_id", "posteam"],
+        plays_per_game[["game_id", "team", "seconds_per_play", "rolling_avg_off_pace"]],
+        on=["game_id", "team"],
         how="left"
     )
 
-    team_games = team_games.drop(columns=["posteam"])
-
-    # --- create home/away pace columns ---
-    team_games["home_rolling_avg_off_pace"] = team_games.loc[team_games["is_home"] == 1, "rolling_avg_off_pace"]
-    team_games["away_rolling_avg_off_pace"] = team_games.loc[team_games["is_home"] == 0, "rolling_avg_off_pace"]
-
-    # forward/backfill within each game so both rows have the home/away pace values
-    team_games["home_rolling_avg_off_pace"] = team_games.groupby("game_id")["home_rolling_avg_off_pace"].transform("max")
-    team_games["away_rolling_avg_off_pace"] = team_games.groupby("game_id")["away_rolling_avg_off_pace"].transform("max")
-
     print("Team pace features created.")
 
     return team_games
@@ -0,0 +1,61 @@
+import pandas as pd
+
+# Per-team columns spread into home_<col> / away_<col> game columns, by the module producing them
+PIVOT_COLUMNS = [
+    # basic
+    "rolling_avg_points_for",
+    "rolling_avg_points_against",
+    # qb
+    "qb_avg_epa",
+    "rolling_avg_qb_epa",
+    "starting_qb",
+    # defense
+    "rolling_avg_def_epa",
+    # pace
+    "rolling_avg_off_pace",
+]
+
+SIDES = (("home", 1), ("away", 0))
+
+
+def pivot_home_away(team_games: pd.DataFrame, columns=PIVOT_COLUMNS) -> pd.DataFrame:
+    """
+    Add every game's home and away team values of per-team columns to both of its rows.
+
+    One reshape over a (game_id, is_home) index replaces a pair of self-merges per
+    feature: the per-team columns are unstacked into one wide row per game, which is
+    aligned back onto team_games once. Column dtypes are kept.
+
+    Parameters
+    ----------
+    team_games : pd.DataFrame
+        One row per (game_id, team) with is_home and the per-team `columns`.
+    columns : list[str]
+        Per-team columns to pivot.
+
+    Returns
+    -------
+    pd.DataFrame
+        team_games with home_<col> columns followed by away_<col> columns; a side
+        missing from a game gives NaN.
+
+    Raises
+    ------
+    ValueError
+        If a game has more than one home or away row.
+    """
+    keyed = team_games[["game_id", "is_home"] + list(columns)].set_index(["game_id", "is_home"])
+    if keyed.index.has_duplicates:
+        duplicates = keyed.index[keyed.index.duplicated()].unique()
+        raise ValueError(f"team_games has duplicate (game_id, is_home) rows, e.g. {list(duplicates[:5])}")
+
+    # one wide row per game; both sides always present, even if no game has one of them
+    sides = pd.MultiIndex.from_product([columns, [is_home for _, is_home in SIDES]])
+    wide = keyed.unstack("is_home").reindex(columns=sides)
+    rows = wide.reindex(team_games["game_id"])
+
+    pivoted = [
+        rows.xs(is_home, axis=1, level=1).add_prefix(f"{side}_").set_axis(team_games.index)
+        for side, is_home in SIDES
+    ]
+    return pd.concat([team_games] + pivoted, axis=1)
@@ -1,40 +1,277 @@
-import pandas as pd
 import os
-from datetime import datetime
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+PREDICTIONS_DIR = "predictions"
+
+# Append-only history of every prediction run (SQLite): one `runs` row per run and one
+# `predictions` row per game per run; only the result columns are filled in later
+STORE_PATH = os.path.join(PREDICTIONS_DIR, "predictions.sqlite")
+
+# Run reports (see src.instrument), one JSON file per run id
+REPORTS_DIR = os.path.join(PREDICTIONS_DIR, "reports")
+
+# Thursday of week 1, used to number the weeks of the season
+SEASON_START = datetime(2025, 9, 4)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    model_fingerprint TEXT,
+    games INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS predictions (
+    run_id TEXT NOT NULL REFERENCES runs (run_id),
+    game_day TEXT NOT NULL,
+    kickoff TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    total_line REAL,
+    predicted_total REAL NOT NULL,
+    predicted_q10 REAL,
+    predicted_q25 REAL,
+    predicted_q50 REAL,
+    predicted_q75 REAL,
+    predicted_q90 REAL,
+    predicted_std REAL,
+    p_over REAL,
+    model_fingerprint TEXT,
+    feature_hash TEXT,
+    closing_line REAL,
+    actual_total REAL,
+    PRIMARY KEY (run_id, home_team, away_team, game_day)
+);
+CREATE INDEX IF NOT EXISTS predictions_game ON predictions (home_team, away_team, game_day);
+CREATE INDEX IF NOT EXISTS predictions_week ON predictions (week);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at);
+"""
+
+# Prediction columns written from the scored games when present (distribution columns are optional)
+PREDICTION_COLUMNS = [
+    "total_line", "predicted_total",
+    "predicted_q10", "predicted_q25", "predicted_q50", "predicted_q75", "predicted_q90",
+    "predicted_std", "p_over",
+]
+
+
+def season_week(dates: pd.Series, season_start=SEASON_START) -> pd.Series:
+    """NFL week of each game date (games before the season start count as week 1)."""
+    return ((pd.to_datetime(dates) - season_start).dt.days // 7 + 1).clip(lower=1)
+
+
+def connect(store_path=STORE_PATH) -> sqlite3.Connection:
+    """Open the prediction store, creating its tables and indexes if needed."""
+    os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+    connection = sqlite3.connect(store_path)
+    connection.executescript(SCHEMA)
+    return connection
 
-def save_predictions(upcoming_team_games: pd.DataFrame):
+
+def report_path(run_id, reports_dir=REPORTS_DIR):
+    return os.path.join(reports_dir, f"{run_id}.json")
+
+
+def feature_hashes(features: pd.DataFrame) -> pd.Series:
+    """Per-row content hash of the model inputs a prediction was made from."""
+    return pd.util.hash_pandas_object(features, index=False).map(lambda h: f"{h:016x}")
+
+
+def _append_run(connection, run_id, created_at, model_fingerprint, rows: pd.DataFrame):
+    connection.execute(
+        "INSERT INTO runs (run_id, created_at, model_fingerprint, games) VALUES (?, ?, ?, ?)",
+        (run_id, created_at, model_fingerprint, len(rows)),
+    )
+    rows = rows.assign(run_id=run_id, model_fingerprint=model_fingerprint)
+    columns = list(rows.columns)
+    connection.executemany(
+        f"INSERT INTO predictions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        rows.astype(object).where(rows.notna(), None).itertuples(index=False, name=None),
+    )
+
+
+def _store_rows(predictions: pd.DataFrame) -> pd.DataFrame:
+    """Store columns of a predictions frame (date, home_team, away_team and PREDICTION_COLUMNS)."""
+    dates = pd.to_datetime(predictions["date"])
+    rows = pd.DataFrame({
+        "game_day": dates.dt.strftime("%Y-%m-%d"),
+        "kickoff": dates.dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "week": season_week(dates),
+        "home_team": predictions["home_team"],
+        "away_team": predictions["away_team"],
+    })
+    for col in PREDICTION_COLUMNS:
+        if col in predictions.columns:
+            rows[col] = predictions[col].to_numpy()
+    return rows
+
+
+def import_legacy_runs(predictions_dir=PREDICTIONS_DIR, store_path=STORE_PATH) -> int:
     """
-    Generates a table of predictions for upcoming NFL games.
+    Add prediction files written by older versions (predictions_YYYYMMDD[_vN].csv/.parquet)
+    to the store, as runs named after the file (YYYYMMDD[_vN]). Already imported files are skipped.
 
-    predictions: DataFrame with columns ['date', 'home_team', 'away_team', 'predicted_total']
-    Saves output to predictions/predictions_mmddyy[_vN].csv
+    Returns the number of runs imported.
     """
+    if not os.path.isdir(predictions_dir):
+        return 0
+    files = sorted(
+        f for f in os.listdir(predictions_dir)
+        if f.startswith("predictions_") and f.endswith((".csv", ".parquet"))
+    )
+    imported = 0
+    with closing(connect(store_path)) as connection, connection:
+        known = {row[0] for row in connection.execute("SELECT run_id FROM runs")}
+        for f in files:
+            run_id = os.path.splitext(f)[0].removeprefix("predictions_")
+            if run_id in known:
+                continue
+            path = os.path.join(predictions_dir, f)
+            predictions = pd.read_parquet(path) if f.endswith(".parquet") else pd.read_csv(path)
+            # the file date is the run date (modification times don't survive a fresh checkout),
+            # and a _vN suffix its order within that day
+            try:
+                _, _, version = run_id.partition("_v")
+                created_at = datetime.strptime(run_id[:8], "%Y%m%d") + timedelta(seconds=int(version or 1))
+            except ValueError:
+                created_at = datetime.fromtimestamp(os.path.getmtime(path))
+            created_at = created_at.isoformat()
+            _append_run(connection, run_id, created_at, None, _store_rows(predictions))
+            imported += 1
+    return imported
 
-    # Create simple data frame containing predictions
-    predictions = upcoming_team_games[['date', 'home_team', 'away_team', 'predicted_total']]
 
-    # Remove duplicate columns if any
-    predictions = predictions.loc[:, ~predictions.columns.duplicated()]
+def read_runs(store_path=STORE_PATH) -> pd.DataFrame:
+    """
+    Every prediction run, newest first (run_id, created_at, model_fingerprint, games).
 
-    # --- build output directory ---
-    predictions_dir = "predictions"
-    os.makedirs(predictions_dir, exist_ok=True)  # create folder if not exists
+    A missing store is first created from the prediction files of older versions.
+    """
+    if not os.path.exists(store_path):
+        import_legacy_runs(os.path.dirname(store_path) or ".", store_path)
+    with closing(connect(store_path)) as connection:
+        return pd.read_sql_query("SELECT * FROM runs ORDER BY created_at DESC", connection)
 
-    today_str = datetime.today().strftime("%Y%m%d")
-    base_filename = f"predictions_{today_str}.csv"
-    output_path = os.path.join(predictions_dir, base_filename)
 
-    # --- check for existing file and add version suffix if needed ---
-    version = 1
-    while os.path.exists(output_path):
-        version += 1
-        filename = f"predictions_{today_str}_v{version}.csv"
-        output_path = os.path.join(predictions_dir, filename)
+def load_run(run_id, store_path=STORE_PATH) -> pd.DataFrame:
+    """One run's predictions, with the kickoff time as `date`."""
+    with closing(connect(store_path)) as connection:
+        predictions = pd.read_sql_query(
+            "SELECT * FROM predictions WHERE run_id = ? ORDER BY kickoff, home_team", connection, params=(run_id,)
+        )
+    predictions.insert(0, "date", pd.to_datetime(predictions.pop("kickoff")))
+    return predictions
 
-    # --- save to CSV ---
-    predictions.to_csv(output_path, index=False)
 
-    print(f"Saved predictions to {output_path}")
-    print(predictions)
+def game_history(home_team, away_team, game_day=None, store_path=STORE_PATH) -> pd.DataFrame:
+    """Every run's prediction of one matchup (optionally on one day 'YYYY-MM-DD'), oldest run first."""
+    query = "SELECT p.* FROM predictions p JOIN runs r USING (run_id) WHERE p.home_team = ? AND p.away_team = ?"
+    params = [home_team, away_team]
+    if game_day is not None:
+        query += " AND p.game_day = ?"
+        params.append(game_day)
+    with closing(connect(store_path)) as connection:
+        return pd.read_sql_query(query + " ORDER BY p.game_day, r.created_at, p.run_id", connection, params=params)
 
-    return predictions
+
+def record_results(games: pd.DataFrame, store_path=STORE_PATH) -> int:
+    """
+    Fill in the closing line and actual total of every stored prediction of completed games.
+
+    Parameters
+    ----------
+    games : pd.DataFrame
+        Schedule rows (games.parquet schema): home_team, away_team, gameday, home_score,
+        away_score and total_line (the closing total).
+
+    Returns
+    -------
+    int
+        Number of prediction rows updated.
+    """
+    if not os.path.exists(store_path):
+        return 0
+    final = games[games["home_score"].notna() & games["away_score"].notna()]
+    results = zip(
+        final["total_line"].astype(float).where(final["total_line"].notna(), None),
+        (final["home_score"] + final["away_score"]).astype(float),
+        final["home_team"],
+        final["away_team"],
+        pd.to_datetime(final["gameday"]).dt.strftime("%Y-%m-%d"),
+    )
+    with closing(connect(store_path)) as connection, connection:
+        updated = connection.executemany(
+            "UPDATE predictions SET closing_line = ?, actual_total = ? "
+            "WHERE home_team = ? AND away_team = ? AND game_day = ? AND actual_total IS NULL",
+            results,
+        ).rowcount
+    print(f"Recorded results for {updated} stored predictions.")
+    return updated
+
+
+def closing_line_value(store_path=STORE_PATH, run_id=None) -> pd.DataFrame:
+    """
+    Closing-line value by week of the side each prediction picks (over if predicted_total > total_line).
+
+    Uses each game's latest prediction (or those of `run_id`). clv is the average number of
+    points the closing line moved in the picked side's favor since the prediction; wins and
+    losses count graded games (pushes excluded).
+    """
+    # latest by run creation time: imported run ids (YYYYMMDD_vN) don't sort by time
+    source = "SELECT * FROM predictions WHERE run_id = ?" if run_id is not None else """
+        SELECT * FROM (
+            SELECT p.*, ROW_NUMBER() OVER (
+                PARTITION BY p.home_team, p.away_team, p.game_day ORDER BY r.created_at DESC, p.run_id DESC
+            ) AS recency
+            FROM predictions p JOIN runs r USING (run_id)
+        ) WHERE recency = 1
+    """
+    query = f"""
+        SELECT week,
+               COUNT(*) AS picks,
+               AVG(CASE WHEN predicted_total > total_line THEN closing_line - total_line
+                        ELSE total_line - closing_line END) AS clv,
+               SUM((predicted_total > total_line) = (actual_total > total_line) AND actual_total != total_line) AS wins,
+               SUM((predicted_total > total_line) != (actual_total > total_line) AND actual_total != total_line) AS losses
+        FROM ({source})
+        WHERE closing_line IS NOT NULL AND total_line IS NOT NULL AND predicted_total != total_line
+        GROUP BY week
+        ORDER BY week
+    """
+    with closing(connect(store_path)) as connection:
+        return pd.read_sql_query(query, connection, params=(run_id,) if run_id is not None else ())
+
+
+def save_predictions(upcoming_team_games: pd.DataFrame, model_fingerprint=None, store_path=STORE_PATH):
+    """
+    Generates a table of predictions for upcoming NFL games.
+
+    predictions: DataFrame with columns ['run_id', 'game_day', 'kickoff', 'week', 'home_team', 'away_team',
+    'total_line', 'predicted_total'] plus the prediction distribution columns when present (quantiles,
+    std, P(over); see src.scoring.prediction_distribution) and each game's feature_hash
+    Appends them to the prediction store (predictions/predictions.sqlite) as a new run,
+    together with the model fingerprint
+    """
+    from src.model import FEATURES
+
+    # Create simple data frame containing predictions
+    predictions = upcoming_team_games.loc[:, ~upcoming_team_games.columns.duplicated()]
+    rows = _store_rows(predictions)
+    if set(FEATURES) <= set(predictions.columns):
+        rows["feature_hash"] = feature_hashes(predictions[FEATURES]).to_numpy()
+
+    # Run ids sort by time and are unique per run, so no file name probing is needed
+    created_at = datetime.now()
+    run_id = created_at.strftime("%Y%m%d_%H%M%S_%f")
+    rows.insert(0, "run_id", run_id)
+    with closing(connect(store_path)) as connection, connection:
+        _append_run(connection, run_id, created_at.isoformat(), model_fingerprint, rows)
+
+    print(f"Saved predictions to {store_path} as run {run_id}")
+    print(rows.drop(columns=["run_id", "game_day", "feature_hash"], errors="ignore"))
+
+    return rows
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+# Default number of prior games in a rolling window
+WINDOW = 5
+
+STATS = ("mean", "std", "ewm")
+
+# Largest log-ratio between ewm weights summed in one pass (exp(300) is far from float overflow)
+EWM_EXPONENT = 300
+
+
+def _group_layout(df: pd.DataFrame, by):
+    """
+    Stable-sort rows by group, keeping each group's rows in their existing order.
+
+    Returns the sort order, the sorted group codes (-1 for rows with a null key),
+    and each sorted row's position within its group.
+    """
+    codes = df.groupby(by, sort=False).ngroup().fillna(-1).to_numpy(dtype="int64")
+    order = np.argsort(codes, kind="stable")
+    codes = codes[order]
+
+    n = len(codes)
+    is_start = np.ones(n, dtype=bool)
+    is_start[1:] = codes[1:] != codes[:-1]
+    starts = np.flatnonzero(is_start)
+    lengths = np.diff(np.append(starts, n))
+    group_start = np.repeat(starts, lengths)
+    position = np.arange(n) - group_start
+
+    return order, codes, position
+
+
+def _grouped_cumsum(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Cumulative sum that restarts at every group boundary (rows must be sorted by group)."""
+    return pd.DataFrame(values).groupby(codes, sort=False).cumsum().to_numpy()
+
+
+def _window_sum(cumsum: np.ndarray, position: np.ndarray, window: int) -> np.ndarray:
+    """Sum over the last `window` rows of each group, from a per-group cumulative sum."""
+    total = cumsum.copy()
+    back = position >= window
+    total[back] -= cumsum[np.flatnonzero(back) - window]
+    return total
+
+
+def _decayed_cumsum(values: np.ndarray, position: np.ndarray, decay: float) -> np.ndarray:
+    """
+    Per-group sum of every row so far weighted by `decay` ** (rows since it), for each column.
+
+    Weights are rebased within fixed-length segments of each group, so they stay in float
+    range however long the group is; each segment then adds the decayed total carried over
+    from the segments before it.
+    """
+    if not len(values):
+        return values.copy()
+    # a segment spans at most exp(EWM_EXPONENT) between its largest and smallest weight
+    with np.errstate(divide="ignore"):
+        segment = max(1, int(EWM_EXPONENT // -np.log(decay)))
+    offset = position % segment
+    segment_id = np.cumsum(offset == 0) - 1
+
+    weights = decay ** -offset.astype("float64")
+    within = _grouped_cumsum(values * weights[:, None], segment_id) * (1.0 / weights)[:, None]
+
+    # carry[s]: decayed total of the group's rows before segment s, as of the end of segment s - 1
+    ends = np.append(np.flatnonzero(segment_id[1:] != segment_id[:-1]), len(segment_id) - 1)
+    rank = position[ends] // segment
+    carry = np.zeros((len(ends), values.shape[1]))
+    for r in range(1, rank.max() + 1):
+        s = np.flatnonzero(rank == r)
+        carry[s] = carry[s - 1] * decay ** segment + within[ends[s - 1]]
+
+    return within + carry[segment_id] * (decay ** (offset + 1.0))[:, None]
+
+
+def rolling_stats(df: pd.DataFrame, by, specs: dict, shift: bool = True, min_periods: int = 1) -> pd.DataFrame:
+    """
+    Compute windowed statistics for many columns at once, per group, with cumulative sums.
+
+    Rows keep their existing order within each group, so `df` should already be sorted
+    chronologically within groups. Windows count rows (like pandas `rolling(window)`),
+    never cross group boundaries, and skip NaN values.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Input rows.
+    by : str or list[str]
+        Grouping column(s). Rows with a null key get NaN.
+    specs : dict
+        Output column name -> (input column, stat, window), where stat is one of
+        "mean" (rolling mean), "std" (rolling sample standard deviation) or
+        "ewm" (exponentially weighted mean with span=window, like pandas `ewm(span=window)`).
+    shift : bool
+        If True, statistics use prior rows only (the current row is excluded).
+    min_periods : int
+        Minimum number of non-NaN values required for a result (cumulative for "ewm").
+
+    Returns
+    -------
+    pd.DataFrame
+        One column per spec, aligned with `df.index`.
+    """
+    for column, stat, window in specs.values():
+        if stat not in STATS:
+            raise ValueError(f"Unknown rolling stat '{stat}' for column '{column}', expected one of {STATS}")
+
+    order, codes, position = _group_layout(df, by)
+    n = len(order)
+
+    # one value matrix for every input column, sorted by group
+    columns = list(dict.fromkeys(column for column, _, _ in specs.values()))
+    values = df[columns].to_numpy(dtype="float64")[order]
+    if shift:
+        shifted = np.full_like(values, np.nan)
+        shifted[1:] = values[:-1]
+        shifted[position == 0] = np.nan
+        values = shifted
+
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    sums = _grouped_cumsum(np.hstack([filled, valid, filled ** 2]), codes)
+    k = len(columns)
+    cum_sum, cum_count, cum_sq = sums[:, :k], sums[:, k:2 * k], sums[:, 2 * k:]
+
+    result = {}
+    for name, (column, stat, window) in specs.items():
+        j = columns.index(column)
+
+        if stat == "ewm":
+            # weights (1 - alpha)^age, like pandas ewm(span=window, adjust=True)
+            decay = 1.0 - 2.0 / (window + 1.0)
+            weighted = _decayed_cumsum(np.column_stack([filled[:, j], valid[:, j]]), position, decay)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out = weighted[:, 0] / weighted[:, 1]
+            out[cum_count[:, j] < min_periods] = np.nan
+
+        else:
+            count = _window_sum(cum_count[:, j], position, window)
+            total = _window_sum(cum_sum[:, j], position, window)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                if stat == "mean":
+                    out = total / count
+                else:
+                    squares = _window_sum(cum_sq[:, j], position, window)
+                    var = np.clip((squares - total ** 2 / count) / (count - 1), 0.0, None)
+                    out = np.where(count > 1, np.sqrt(var), np.nan)
+            out[count < max(min_periods, 1)] = np.nan
+
+        out[codes < 0] = np.nan
+        unsorted = np.empty(n)
+        unsorted[order] = out
+        result[name] = unsorted
+
+    return pd.DataFrame(result, index=df.index)
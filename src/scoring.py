@@ -0,0 +1,153 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.forest import as_compact
+from src.model import FEATURES
+
+# Per-team rolling features carried from a team's latest game into its next one
+ROLLING_FEATURES = [
+    "rolling_avg_points_for",
+    "rolling_avg_points_against",
+    "rolling_avg_qb_epa",
+    "rolling_avg_def_epa",
+    "rolling_avg_off_pace",
+]
+
+# Game-level inputs a caller supplies per matchup (line and forecast weather)
+GAME_INPUTS = ["total_line", "home_temperature", "home_wind_speed"]
+
+# Quantiles of the per-tree predictions reported by the distribution mode
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Latest team state, saved by each pipeline run next to the model for the prediction service
+TEAM_STATE_PATH = "model/team_state.parquet"
+
+
+def team_state_snapshot(team_games: pd.DataFrame) -> pd.DataFrame:
+    """
+    Latest value of every rolling feature per team, in one groupby pass.
+
+    Expects team_games in time order within each team (as built by `build_team_games`);
+    missing values are skipped, so each feature comes from the team's latest game that has it.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by team code, one column per ROLLING_FEATURES entry.
+    """
+    return team_games.groupby("team")[ROLLING_FEATURES].last()
+
+
+def save_team_state(state: pd.DataFrame, path=TEAM_STATE_PATH):
+    """Write a team state snapshot atomically (readers never see a partial file)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    state.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_team_state(path=TEAM_STATE_PATH) -> pd.DataFrame:
+    return pd.read_parquet(path)
+
+
+def game_features(games: pd.DataFrame, state: pd.DataFrame) -> pd.DataFrame:
+    """
+    Model features for a batch of matchups.
+
+    Parameters
+    ----------
+    games : pd.DataFrame
+        One row per matchup with home_team and away_team (team codes) and GAME_INPUTS.
+    state : pd.DataFrame
+        Team state snapshot (see `team_state_snapshot`).
+
+    Returns
+    -------
+    pd.DataFrame
+        FEATURES columns, aligned to games.index.
+    """
+    features = pd.DataFrame(index=games.index)
+    home = state.reindex(games["home_team"]).to_numpy()
+    away = state.reindex(games["away_team"]).to_numpy()
+    for j, col in enumerate(state.columns):
+        features[f"home_{col}"] = home[:, j]
+        features[f"away_{col}"] = away[:, j]
+    for col in GAME_INPUTS:
+        features[col] = games[col].to_numpy(dtype=float)
+    return features[FEATURES]
+
+
+def prediction_distribution(model, features: pd.DataFrame, total_line, quantiles=QUANTILES) -> pd.DataFrame:
+    """
+    Distribution of a forest's predictions over its trees.
+
+    All per-tree predictions come from one vectorized pass over the forest's node arrays
+    (see src.forest.CompactForest), as an (n_games, n_trees) array.
+
+    Returns
+    -------
+    pd.DataFrame
+        Aligned to features.index: predicted_total (mean over trees), predicted_q<NN> per
+        quantile, predicted_std, and p_over, the share of trees predicting more than total_line.
+    """
+    trees = as_compact(model).predict_trees(features)
+    line = np.asarray(total_line, dtype=float)[:, None]
+
+    distribution = pd.DataFrame(index=features.index)
+    distribution["predicted_total"] = trees.mean(axis=1)
+    for q, values in zip(quantiles, np.quantile(trees, quantiles, axis=1)):
+        distribution[f"predicted_q{round(q * 100):02d}"] = values
+    distribution["predicted_std"] = trees.std(axis=1)
+    distribution["p_over"] = (trees > line).mean(axis=1)
+    return distribution
+
+
+def score(games: pd.DataFrame, state: pd.DataFrame, model, distribution=False) -> pd.DataFrame:
+    """
+    Predict totals for any number of matchups in one vectorized model call.
+
+    Matchups can be real or hypothetical (see `sweep` for line and weather grids).
+
+    Parameters
+    ----------
+    games : pd.DataFrame
+        home_team, away_team (team codes), total_line, home_temperature, home_wind_speed;
+        other columns are passed through.
+    state : pd.DataFrame
+        Team state snapshot (see `team_state_snapshot`).
+    model
+        Fitted model with a `predict` method taking FEATURES columns.
+    distribution : bool
+        Also add the per-tree prediction distribution (quantiles, std, P(over)); needs a
+        random forest (see `prediction_distribution`).
+
+    Returns
+    -------
+    pd.DataFrame
+        `games` with the model features and predicted_total added.
+    """
+    features = game_features(games, state)
+    scored = games.copy()
+    for col in FEATURES:
+        scored[col] = features[col]
+    if distribution:
+        dist = prediction_distribution(model, features, games["total_line"])
+        for col in dist.columns:
+            scored[col] = dist[col]
+    else:
+        scored["predicted_total"] = model.predict(features) if len(features) else np.array([], dtype=float)
+    return scored
+
+
+def sweep(games: pd.DataFrame, **values) -> pd.DataFrame:
+    """
+    Every combination of `games` with the given input values, for what-if scoring.
+
+    Example: sweep(games, total_line=np.arange(38, 56, 0.5), home_wind_speed=[0, 10, 20])
+    """
+    scenarios = games.drop(columns=list(values), errors="ignore")
+    for col, grid in values.items():
+        scenarios = scenarios.merge(pd.DataFrame({col: list(grid)}), how="cross")
+    return scenarios
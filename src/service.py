@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from src.model import COMPACT_MODEL_PATH, MODEL_PATH, load_compact_model, load_model
+from src.scoring import GAME_INPUTS, TEAM_STATE_PATH, load_team_state, score
+from src.weather_forecast import TEAM_ABBREV
+
+HOST = "127.0.0.1"
+PORT = 8000
+
+
+class PredictionState:
+    """
+    Model and team state held in memory, reloaded when a pipeline run publishes new ones.
+
+    A pipeline run writes the team state last, after the model and its compact export,
+    so the team state file's modification time versions the pair. Every request checks
+    it (one stat call) and, when it changed, loads both artifacts and swaps them in
+    together, so the service picks up each run without restarting and never pairs a
+    new team state with an old model (or the reverse) while a run is still training.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, compact_path=COMPACT_MODEL_PATH, state_path=TEAM_STATE_PATH):
+        self.model_path = model_path
+        self.compact_path = compact_path
+        self.state_path = state_path
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.model = None
+        self.team_state = None
+        self.refresh()
+
+    def _stamp(self):
+        return os.stat(self.state_path).st_mtime_ns if os.path.exists(self.state_path) else None
+
+    def refresh(self):
+        """Reload the model and team state if a new team state was published since the last load."""
+        stamp = self._stamp()
+        if stamp is not None and stamp == self.stamp:
+            return
+        with self.lock:
+            if stamp is not None and stamp == self.stamp:
+                return
+            model = load_compact_model(self.compact_path)
+            if model is None:
+                model, _ = load_model(self.model_path)
+            if model is None:
+                raise FileNotFoundError(f"No trained model at {self.model_path}. Run main.py first.")
+            team_state = load_team_state(self.state_path)
+            # swap both at once so a request never mixes artifacts from different runs
+            self.model, self.team_state, self.stamp = model, team_state, stamp
+            print(f"Loaded model ({model.n_estimators} trees) and state for {len(team_state)} teams.")
+
+    def predict(self, games: list, distribution=False) -> list:
+        """Score a list of game dicts (team names or codes, line and weather)."""
+        self.refresh()
+        model, team_state = self.model, self.team_state
+
+        if not games:
+            return []
+        df = pd.DataFrame(games)
+        required = ["home_team", "away_team"] + GAME_INPUTS
+        missing = {
+            i: [col for col in required if col not in df or pd.isna(df.at[i, col])]
+            for i in df.index
+        }
+        missing = {i: cols for i, cols in missing.items() if cols}
+        if missing:
+            raise ValueError(f"Missing fields (by game index): {missing}")
+        for col in ("home_team", "away_team"):
+            df[col] = df[col].map(lambda team: TEAM_ABBREV.get(team, team))
+        unknown = sorted(set(df["home_team"]).union(df["away_team"]) - set(team_state.index))
+        if unknown:
+            raise ValueError(f"Unknown teams: {unknown}")
+
+        scored = score(df, team_state, model, distribution=distribution)
+        outputs = [c for c in scored.columns if c.startswith("predicted") or c == "p_over"]
+        return json.loads(scored[list(df.columns) + outputs].to_json(orient="records"))
+
+    def info(self) -> dict:
+        self.refresh()
+        return {
+            "model": self.compact_path if os.path.exists(self.compact_path) else self.model_path,
+            "trees": self.model.n_estimators,
+            "teams": len(self.team_state),
+        }
+
+
+def make_handler(state: PredictionState):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _fail(self, e):
+            """500 response for errors outside the request (e.g. a failed artifact reload)."""
+            print(f"[ERROR] {self.command} {self.path}: {type(e).__name__}: {e}")
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def do_GET(self):
+            if self.path != "/health":
+                self._send(404, {"error": f"Unknown path {self.path}"})
+                return
+            try:
+                self._send(200, state.info())
+            except Exception as e:
+                self._fail(e)
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": f"Unknown path {self.path}"})
+                return
+            # reload failures are the service's fault, not the request's
+            try:
+                state.refresh()
+            except Exception as e:
+                self._fail(e)
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                games = request["games"] if isinstance(request, dict) else request
+                distribution = request.get("distribution", False) if isinstance(request, dict) else False
+                predictions = state.predict(games, distribution)
+            except (KeyError, ValueError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+                return
+            except Exception as e:
+                self._fail(e)
+                return
+            self._send(200, {"predictions": predictions})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host=HOST, port=PORT, state=None):
+    """
+    Run the prediction service.
+
+    GET  /health   -> loaded model and team state
+    POST /predict  {"games": [{"home_team", "away_team", "total_line",
+                               "home_temperature", "home_wind_speed"}, ...],
+                    "distribution": false}
+                   -> {"predictions": [... with predicted_total (and quantiles, std, p_over)]}
+
+    Teams may be codes ("KC") or full names ("Kansas City Chiefs"). Every field is
+    required (dome games take 70°F and no wind); a request with missing or null fields
+    gets a 400 listing them per game.
+    """
+    state = state or PredictionState()
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    print(f"Serving predictions on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON prediction service.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    serve(args.host, args.port)
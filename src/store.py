@@ -0,0 +1,106 @@
+import hashlib
+import inspect
+import json
+import os
+import pandas as pd
+
+STORE_DIR = "data/feature_store"
+
+# Sidecar that remembers content hashes by (size, mtime) so unchanged files are not re-read
+FINGERPRINTS_FILE = "fingerprints.json"
+
+
+def _hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _list_files(paths):
+    """Expand files and directories (recursively) into a sorted list of file paths."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names)
+        elif os.path.exists(path):
+            files.append(path)
+    return sorted(files)
+
+
+def fingerprint_files(paths, store_dir=STORE_DIR) -> str:
+    """
+    Content hash of a set of files and directories.
+
+    File hashes are memoized in the store directory keyed by path, size and mtime, so
+    re-fingerprinting large unchanged inputs only costs a stat call. Missing paths are
+    part of the fingerprint (as absent), so creating them changes it.
+    """
+    memo_path = os.path.join(store_dir, FINGERPRINTS_FILE)
+    memo = {}
+    if os.path.exists(memo_path):
+        with open(memo_path) as f:
+            memo = json.load(f)
+
+    digest = hashlib.blake2b(digest_size=16)
+    changed = False
+    for path in _list_files(paths):
+        stat = os.stat(path)
+        stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+        entry = memo.get(path)
+        if entry is None or entry["stamp"] != stamp:
+            entry = {"stamp": stamp, "hash": _hash_file(path)}
+            memo[path] = entry
+            changed = True
+        digest.update(f"{os.path.normpath(path)}={entry['hash']};".encode())
+    for path in sorted(paths):
+        digest.update(f"{path}:{os.path.exists(path)};".encode())
+
+    if changed:
+        os.makedirs(store_dir, exist_ok=True)
+        with open(memo_path, "w") as f:
+            json.dump(memo, f, indent=1)
+
+    return digest.hexdigest()
+
+
+def code_version(*objects) -> str:
+    """Hash of the source code of the modules that define the given functions/modules."""
+    digest = hashlib.blake2b(digest_size=16)
+    for obj in objects:
+        module = inspect.getmodule(obj)
+        digest.update(inspect.getsource(module).encode())
+    return digest.hexdigest()
+
+
+def stage_key(name: str, parent: str, code: str, params=None) -> str:
+    """Key for a stage output: its name, upstream key, code version and parameters."""
+    payload = json.dumps(
+        {"stage": name, "parent": parent, "code": code, "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def stage_path(name: str, key: str, store_dir=STORE_DIR) -> str:
+    return os.path.join(store_dir, f"{name}-{key}.parquet")
+
+
+def load_stage(name: str, key: str, store_dir=STORE_DIR):
+    """Return the cached output of a stage, or None if it has not been stored."""
+    path = stage_path(name, key, store_dir)
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+def save_stage(name: str, key: str, df: pd.DataFrame, store_dir=STORE_DIR):
+    """Write a stage output atomically, so an interrupted run never leaves a partial entry."""
+    os.makedirs(store_dir, exist_ok=True)
+    path = stage_path(name, key, store_dir)
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
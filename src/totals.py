@@ -1,12 +1,29 @@
 import requests
+import numpy as np
 import pandas as pd
 import os
 from dotenv import load_dotenv
-from datetime import datetime, timezone
 from pytz import timezone as tz
 
+from src.cache import CACHE_DIR, conditional_get, is_expired, read_table, write_table
+from src.odds import normalize_odds
 
-DATA_PATH = "data/nfl_over_unders.csv"
+
+ODDS_URL = "https://api.the-odds-api.com/v4/sports/americanfootball_nfl/odds/"
+ODDS_CACHE_PATH = os.path.join(CACHE_DIR, "odds.parquet")
+
+# How long a cached line stays fresh, by time remaining until kickoff (first match wins)
+ODDS_TTLS = [
+    (pd.Timedelta(hours=3), pd.Timedelta(minutes=5)),
+    (pd.Timedelta(days=1), pd.Timedelta(minutes=30)),
+    (pd.Timedelta(days=3), pd.Timedelta(hours=2)),
+]
+ODDS_DEFAULT_TTL = pd.Timedelta(hours=6)
+
+# How often the full slate is re-fetched to pick up newly listed games
+SLATE_TTL = pd.Timedelta(hours=6)
+
+TIMEOUT = 10  # seconds
 
 load_dotenv()
 API_KEY = os.getenv("API_KEY_TOTALS")
@@ -15,62 +32,119 @@ if not API_KEY:
     raise ValueError("Missing API_KEY_TOTALS in .env file")
 
 
-def get_totals_from_api(api_key=API_KEY):
-    url = (
-        f"https://api.the-odds-api.com/v4/sports/americanfootball_nfl/odds/"
-        f"?apiKey={api_key}&regions=us&markets=totals&oddsFormat=american"
+def _parse_totals(data):
+    """DraftKings over lines from one odds response (see src.odds for every book and side)."""
+    odds = normalize_odds([(None, data)])
+    dk = odds[(odds['bookmaker'].astype(str).str.lower() == 'draftkings') & (odds['side'] == 'Over')]
+
+    games = pd.DataFrame({
+        'event_id': dk['event_id'].astype(str),
+        'home_team': dk['home_team'].astype(str),
+        'away_team': dk['away_team'].astype(str),
+        # Convert to Eastern timezone, tz-aware
+        'commence_time': dk['commence_time'].dt.tz_convert(tz("US/Eastern")),
+        'total_line': dk['point'].astype(float),
+        'bookmaker': dk['bookmaker'].astype(str),
+    })
+    return games.reset_index(drop=True)
+
+
+def get_totals_from_api(api_key=API_KEY, event_ids=None, etag=None, last_modified=None, session=None, url=ODDS_URL):
+    """
+    Fetch DraftKings totals for upcoming games.
+
+    Parameters
+    ----------
+    event_ids : list[str], optional
+        Only fetch these events (the API's `eventIds` filter); defaults to the full slate.
+    etag, last_modified : str, optional
+        Validators from a previous response, sent as a conditional request.
+
+    Returns
+    -------
+    (totals, etag, last_modified)
+        `totals` is None if the server answered 304 Not Modified.
+    """
+    params = {"apiKey": api_key, "regions": "us", "markets": "totals", "oddsFormat": "american"}
+    if event_ids is not None:
+        params["eventIds"] = ",".join(event_ids)
+
+    session = session or requests.Session()
+    data, etag, last_modified = conditional_get(
+        session, url, params=params, etag=etag, last_modified=last_modified, timeout=TIMEOUT
     )
-    resp = requests.get(url)
-    resp.raise_for_status()
-    data = resp.json()
-    games = []
+    if data is None:
+        return None, etag, last_modified
+    return _parse_totals(data), etag, last_modified
 
-    eastern = tz("US/Eastern")
 
-    for game in data:
-        if not game.get('bookmakers'):
-            continue
-
-        # Parse commence_time as UTC
-        commence_time_utc = datetime.fromisoformat(game['commence_time'].replace("Z", "+00:00"))
-
-        # Only consider DraftKings
-        dk_bookmakers = [b for b in game['bookmakers'] if b['title'].lower() == 'draftkings']
-        if not dk_bookmakers:
-            continue  # skip if DraftKings not available
-
-        bookmaker = dk_bookmakers[0]  # take the DraftKings bookmaker
-        for market in bookmaker['markets']:
-            if market['key'] == 'totals':
-                for outcome in market['outcomes']:
-                    if outcome['name'] == 'Over':
-                        # Convert to Eastern timezone, tz-aware
-                        commence_time_eastern = commence_time_utc.astimezone(eastern)
-                        games.append({
-                            'home_team': game['home_team'],
-                            'away_team': game['away_team'],
-                            'commence_time': commence_time_eastern,
-                            'total_line': outcome['point'],
-                            'bookmaker': bookmaker['title']
-                        })
-
-    return pd.DataFrame(games)
-
-
-def get_totals(path=DATA_PATH, api_key=API_KEY):
+def odds_ttl(commence_time: pd.Series, now) -> pd.Series:
+    """Per-game TTL: lines expire faster the closer the game is to kickoff."""
+    until_kickoff = commence_time - now
+    conditions = [until_kickoff <= limit for limit, _ in ODDS_TTLS]
+    choices = [ttl.to_timedelta64() for _, ttl in ODDS_TTLS]
+    ttl = np.select(conditions, choices, default=ODDS_DEFAULT_TTL.to_timedelta64())
+    return pd.Series(pd.to_timedelta(ttl), index=commence_time.index)
+
+
+def _to_cache_rows(totals, fetched_at, slate_fetched_at, etag=None, last_modified=None):
+    rows = totals.copy()
+    rows['commence_time'] = pd.to_datetime(rows['commence_time'], utc=True)
+    rows['fetched_at'] = fetched_at
+    rows['slate_fetched_at'] = slate_fetched_at
+    rows['etag'] = etag
+    rows['last_modified'] = last_modified
+    return rows
+
+
+def _last_validator(cache, column):
+    if cache.empty or cache[column].isna().all():
+        return None
+    return cache[column].dropna().iloc[-1]
+
+
+def get_totals(api_key=API_KEY, cache_path=ODDS_CACHE_PATH, now=None):
+    """
+    Vegas totals for upcoming games, served from a TTL cache.
+
+    The full slate is fetched when the cache is empty or older than SLATE_TTL (as a
+    conditional request). Otherwise only games whose line has outlived its ODDS_TTLS entry
+    are re-fetched, by event id. Returns commence_time as naive US/Eastern wall time.
+    """
     eastern = tz("US/Eastern")
+    now = now if now is not None else pd.Timestamp.now(tz="UTC")
+    cache = read_table(cache_path)
 
-    if os.path.exists(path):
-        print(f"Reading cached Vegas totals for upcoming games from {path}...")
-        df = pd.read_csv(path)
-        
-        # Ensure datetime, handle tz-aware safely
-        df['commence_time'] = pd.to_datetime(df['commence_time'], errors='coerce', utc=True)
-        df['commence_time'] = df['commence_time'].dt.tz_convert(eastern).dt.tz_localize(None)
-        
-        return df
-    else:
+    if cache.empty or is_expired(cache['slate_fetched_at'].max(), SLATE_TTL, now):
         print("Downloading fresh Vegas totals for upcoming games...")
-        df = get_totals_from_api(api_key)
-        df.to_csv(path, index=False)
-        return df
+        totals, etag, last_modified = get_totals_from_api(
+            api_key, etag=_last_validator(cache, 'etag'), last_modified=_last_validator(cache, 'last_modified')
+        )
+        if totals is None:
+            cache['fetched_at'] = now
+            cache['slate_fetched_at'] = now
+        else:
+            cache = _to_cache_rows(totals, now, now, etag, last_modified)
+        write_table(cache_path, cache)
+
+    else:
+        expired = is_expired(cache['fetched_at'], odds_ttl(cache['commence_time'], now), now)
+        if expired.any():
+            event_ids = cache.loc[expired, 'event_id'].tolist()
+            print(f"Refreshing Vegas totals for {len(event_ids)} games with expired lines...")
+            totals, _, _ = get_totals_from_api(api_key, event_ids=event_ids)
+            cache = (
+                pd.concat(
+                    [cache[~expired], _to_cache_rows(totals, now, cache['slate_fetched_at'].max())],
+                    ignore_index=True,
+                )
+                .sort_values('commence_time', kind='stable')
+                .reset_index(drop=True)
+            )
+            write_table(cache_path, cache)
+        else:
+            print(f"Reading cached Vegas totals for upcoming games from {cache_path}...")
+
+    df = cache[['home_team', 'away_team', 'commence_time', 'total_line', 'bookmaker']].copy()
+    df['commence_time'] = df['commence_time'].dt.tz_convert(eastern).dt.tz_localize(None)
+    return df
@@ -0,0 +1,238 @@
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import ParameterSampler
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.backtest import time_ordered_matrix, walk_forward_folds
+from src.model import FEATURES, TARGET
+
+LEADERBOARD_PATH = "tuning/leaderboard.csv"
+
+# Hyperparameter values sampled per model family
+SEARCH_SPACE = {
+    "rf": {
+        "n_estimators": [200, 500],
+        "max_depth": [None, 6, 10, 16],
+        "min_samples_leaf": [1, 3, 5, 10, 20],
+        "max_features": [1.0, 0.5, "sqrt"],
+    },
+    "hgb": {
+        "learning_rate": [0.02, 0.05, 0.1],
+        "max_iter": [100, 300],
+        "max_leaf_nodes": [7, 15, 31],
+        "min_samples_leaf": [10, 20, 40],
+        "l2_regularization": [0.0, 1.0, 10.0],
+    },
+    "ridge": {
+        "alpha": [0.1, 1.0, 10.0, 100.0, 1000.0],
+    },
+}
+
+# Successive halving: keep the best 1/ETA candidates after each rung
+ETA = 3
+
+# Worker process state, set once per worker so tasks only pass candidate params and row offsets
+_X = None
+_y = None
+
+
+def make_estimator(family, params, random_state=42):
+    """An unfitted regressor of a model family with the given hyperparameters."""
+    if family == "rf":
+        return RandomForestRegressor(**params, random_state=random_state, n_jobs=1)
+    if family == "hgb":
+        return HistGradientBoostingRegressor(**params, random_state=random_state)
+    if family == "ridge":
+        return make_pipeline(StandardScaler(), Ridge(**params))
+    raise ValueError(f"Unknown model family: {family!r}")
+
+
+def sample_candidates(n_candidates, search_space=SEARCH_SPACE, random_state=42) -> list:
+    """Up to `n_candidates` (family, params) pairs, split evenly across families."""
+    per_family = math.ceil(n_candidates / len(search_space))
+    candidates = []
+    for family, space in search_space.items():
+        grid_size = math.prod(len(values) for values in space.values())
+        for params in ParameterSampler(space, min(per_family, grid_size), random_state=random_state):
+            candidates.append((family, params))
+    return candidates
+
+
+def rung_folds(n_folds, n_rungs, eta=ETA) -> list:
+    """Number of folds each rung evaluates on: grows by `eta` per rung, ending at all folds."""
+    return [max(1, math.ceil(n_folds / eta ** (n_rungs - 1 - rung))) for rung in range(n_rungs)]
+
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+
+def _evaluate(task):
+    family, params, (test_start, test_end), random_state = task
+    model = make_estimator(family, params, random_state)
+    model.fit(_X[:test_start], _y[:test_start])
+    errors = np.abs(model.predict(_X[test_start:test_end]) - _y[test_start:test_end])
+    return float(errors.sum()), len(errors)
+
+
+def _mae(fold_scores: dict) -> float:
+    errors = sum(e for e, _ in fold_scores.values())
+    games = sum(n for _, n in fold_scores.values())
+    return errors / games if games else float("nan")
+
+
+def tune(
+    team_games: pd.DataFrame,
+    n_candidates=30,
+    step="season",
+    start_season=None,
+    eta=ETA,
+    budget_seconds=None,
+    workers=None,
+    random_state=42,
+    search_space=SEARCH_SPACE,
+    leaderboard_path=LEADERBOARD_PATH,
+):
+    """
+    Successive-halving hyperparameter search over model families on walk-forward folds.
+
+    Every candidate is first scored (MAE) on the most recent fold(s). After each rung only
+    the best 1/`eta` candidates survive and are scored on `eta` times as many folds, so
+    most of the compute goes to the promising ones. Fold results are kept between rungs,
+    so a survivor is only fitted on the folds it has not seen yet.
+
+    The time-ordered model matrix is built once and handed to each worker process once;
+    tasks are (candidate, fold) pairs run in parallel.
+
+    Parameters
+    ----------
+    team_games : pd.DataFrame
+        Team-game level dataset, e.g. from `build_team_games()`.
+    n_candidates : int
+        Candidates sampled from `search_space` (split across families).
+    step : str
+        'week' or 'season' walk-forward folds (see backtest.walk_forward_folds).
+    start_season : int, optional
+        First season predicted by the folds.
+    eta : int
+        Halving rate.
+    budget_seconds : float, optional
+        Stop after the rung during which the budget ran out.
+    workers : int, optional
+        Worker processes (default: one per core).
+    leaderboard_path : str, optional
+        Where to write the leaderboard CSV.
+
+    Returns
+    -------
+    pd.DataFrame
+        Leaderboard: one row per candidate with family, params, the rung it reached,
+        folds and games evaluated and MAE, best first.
+    """
+    if n_candidates < 1:
+        raise ValueError(f"n_candidates must be at least 1, got {n_candidates}")
+    started = time.perf_counter()
+
+    matrix = time_ordered_matrix(team_games)
+    # most recent folds first, so the early rungs score candidates on the latest seasons
+    folds = walk_forward_folds(matrix, step, start_season)[::-1]
+    if not folds:
+        raise ValueError("No walk-forward folds: need games before the first test season.")
+    candidates = sample_candidates(n_candidates, search_space, random_state)
+
+    X = matrix[FEATURES].to_numpy(dtype=np.float64)
+    y = matrix[TARGET].to_numpy(dtype=np.float64)
+
+    n_rungs = max(1, math.ceil(math.log(len(candidates), eta)))
+    # with few folds, rungs that would not add folds are merged
+    schedule = sorted(set(rung_folds(len(folds), n_rungs, eta)))
+
+    # candidate index -> fold index -> (absolute error sum, games)
+    scores = {i: {} for i in range(len(candidates))}
+    reached = {i: 0 for i in range(len(candidates))}
+    alive = list(range(len(candidates)))
+
+    print(f"Tuning {len(candidates)} candidates over {len(folds)} folds in {len(schedule)} rungs...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y)) as pool:
+        for rung, n_folds in enumerate(schedule):
+            tasks = [
+                (i, f) for i in alive for f in range(n_folds) if f not in scores[i]
+            ]
+            results = pool.map(
+                _evaluate,
+                [(*candidates[i], folds[f], random_state) for i, f in tasks],
+            )
+            for (i, f), result in zip(tasks, results):
+                scores[i][f] = result
+                reached[i] = rung
+
+            mae = {i: _mae(scores[i]) for i in alive}
+            best = min(alive, key=mae.get)
+            print(
+                f"Rung {rung}: {len(alive)} candidates on {n_folds} folds, "
+                f"best MAE {mae[best]:.3f} ({candidates[best][0]} {candidates[best][1]})"
+            )
+
+            if budget_seconds is not None and time.perf_counter() - started > budget_seconds:
+                print(f"Tuning budget of {budget_seconds}s used; stopping after rung {rung}.")
+                break
+            keep = max(1, len(alive) // eta)
+            if rung == len(schedule) - 1 or keep == len(alive):
+                break
+            alive = sorted(alive, key=mae.get)[:keep]
+
+    leaderboard = pd.DataFrame([
+        {
+            "family": candidates[i][0],
+            "params": json.dumps(candidates[i][1], sort_keys=True),
+            "rung": reached[i],
+            "folds": len(scores[i]),
+            "games": sum(n for _, n in scores[i].values()),
+            "MAE": _mae(scores[i]),
+        }
+        for i in range(len(candidates))
+    ]).sort_values(["rung", "MAE"], ascending=[False, True]).reset_index(drop=True)
+
+    if leaderboard_path:
+        os.makedirs(os.path.dirname(leaderboard_path) or ".", exist_ok=True)
+        leaderboard.to_csv(leaderboard_path, index=False)
+        print(f"Leaderboard saved to {leaderboard_path}")
+
+    print(f"Tuning complete in {time.perf_counter() - started:.1f}s.")
+    print(leaderboard.head(10).to_string(index=False))
+
+    return leaderboard
+
+
+if __name__ == "__main__":
+    from src.features import build_team_games
+
+    parser = argparse.ArgumentParser(description="Successive-halving search over model families.")
+    parser.add_argument("--candidates", type=int, default=30)
+    parser.add_argument("--step", choices=["week", "season"], default="season")
+    parser.add_argument("--start-season", type=int)
+    parser.add_argument("--budget", type=float, help="Time budget in seconds.")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--leaderboard", default=LEADERBOARD_PATH)
+    args = parser.parse_args()
+
+    tune(
+        build_team_games(),
+        n_candidates=args.candidates,
+        step=args.step,
+        start_season=args.start_season,
+        budget_seconds=args.budget,
+        workers=args.workers,
+        leaderboard_path=args.leaderboard,
+    )
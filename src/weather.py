@@ -1,114 +1,224 @@
 import os
+import numpy as np
 import pandas as pd
 from meteostat import Point, Daily
 
-def create_weather_features(team_games, cache_dir="data/weather_cache"):
+# Consolidated daily weather store keyed by (station, date), plus the date ranges fetched per station
+WEATHER_STORE_PATH = "data/weather.parquet"
+COVERAGE_PATH = "data/weather_coverage.parquet"
+
+# Per-team CSV cache used before the consolidated store; imported into it on first use
+LEGACY_CACHE_DIR = "data/weather_cache"
+
+WEATHER_COLUMNS = ["temperature", "precipitation", "wind_speed"]
+
+# NFL stadium coordinates (home team -> lat/lon)
+STADIUM_COORDS = {
+    "ARI": {"lat": 33.5275, "lon": -112.2625},
+    "ATL": {"lat": 33.755, "lon": -84.4008},
+    "BAL": {"lat": 39.2779, "lon": -76.6227},
+    "BUF": {"lat": 42.7738, "lon": -78.7865},
+    "CAR": {"lat": 35.2251, "lon": -80.8529},
+    "CHI": {"lat": 41.8623, "lon": -87.6167},
+    "CIN": {"lat": 39.0955, "lon": -84.5161},
+    "CLE": {"lat": 41.5061, "lon": -81.6995},
+    "DAL": {"lat": 32.7473, "lon": -97.0945},
+    "DEN": {"lat": 39.7439, "lon": -105.0201},
+    "DET": {"lat": 42.3400, "lon": -83.0456},
+    "GB": {"lat": 44.5013, "lon": -88.0622},
+    "HOU": {"lat": 29.6847, "lon": -95.4107},
+    "IND": {"lat": 39.7640, "lon": -86.1639},
+    "JAX": {"lat": 30.3240, "lon": -81.6375},
+    "KC": {"lat": 39.0489, "lon": -94.4839},
+    "LV": {"lat": 36.0908, "lon": -115.1830},
+    "LAC": {"lat": 33.9535, "lon": -118.3392},
+    "LA": {"lat": 34.0141, "lon": -118.2872},
+    "MIA": {"lat": 25.9580, "lon": -80.2389},
+    "MIN": {"lat": 44.9733, "lon": -93.2572},
+    "NE": {"lat": 42.0909, "lon": -71.2643},
+    "NO": {"lat": 29.9511, "lon": -90.0812},
+    "NYG": {"lat": 40.8135, "lon": -74.0744},
+    "NYJ": {"lat": 40.8135, "lon": -74.0744},  # Shares MetLife Stadium
+    "PHI": {"lat": 39.9008, "lon": -75.1675},
+    "PIT": {"lat": 40.4469, "lon": -80.0158},
+    "SEA": {"lat": 47.5952, "lon": -122.3316},
+    "SF": {"lat": 37.4030, "lon": -121.9700},
+    "TB": {"lat": 27.9759, "lon": -82.5033},
+    "TEN": {"lat": 36.1662, "lon": -86.7713},
+    "WAS": {"lat": 38.9076, "lon": -77.0209}
+}
+
+# Dome teams (team codes); their home games get neutral weather
+DOME_TEAMS = {"ARI", "ATL", "DAL", "DET", "HOU", "IND", "LV", "LAC", "LA", "MIN", "NO"}
+
+# Weather assigned to games played indoors
+DOME_WEATHER = {"temperature": 70.0, "precipitation": 0.0, "wind_speed": 0.0}
+
+
+def station_id(team):
+    """Weather station key for a team's stadium; teams sharing a stadium share a station."""
+    coords = STADIUM_COORDS[team]
+    return f"{coords['lat']:.4f},{coords['lon']:.4f}"
+
+
+def fetch_meteostat(lat, lon, start, end):
+    """Daily weather for a point from Meteostat, as (date, temperature, precipitation, wind_speed)."""
+    weather = Daily(Point(float(lat), float(lon)), start, end).fetch().reset_index()
+    weather = weather[["time", "tavg", "prcp", "wspd"]]
+    weather.columns = ["date"] + WEATHER_COLUMNS
+    return weather
+
+
+def _merge_ranges(ranges: pd.DataFrame) -> pd.DataFrame:
+    """Merge overlapping or adjacent [start, end] day ranges per station."""
+    if ranges.empty:
+        return ranges
+    ranges = ranges.sort_values(["station", "start"]).reset_index(drop=True)
+    prev_end = ranges.groupby("station")["end"].transform(lambda e: e.cummax().shift())
+    new_block = prev_end.isna() | (ranges["start"] > prev_end + pd.Timedelta(days=1))
+    block = new_block.cumsum()
+    return (
+        ranges.groupby([ranges["station"], block])
+        .agg(station=("station", "first"), start=("start", "min"), end=("end", "max"))
+        .reset_index(drop=True)
+    )
+
+
+def _missing_ranges(station, start, end, coverage: pd.DataFrame):
+    """Sub-ranges of [start, end] not covered by a station's fetched ranges."""
+    covered = coverage[coverage["station"] == station].sort_values("start")
+    missing, cursor = [], start
+    for _, row in covered.iterrows():
+        if row["end"] < cursor:
+            continue
+        if row["start"] > end:
+            break
+        if row["start"] > cursor:
+            missing.append((cursor, row["start"] - pd.Timedelta(days=1)))
+        cursor = max(cursor, row["end"] + pd.Timedelta(days=1))
+    if cursor <= end:
+        missing.append((cursor, end))
+    return missing
+
+
+def _import_legacy_cache(cache_dir=LEGACY_CACHE_DIR):
+    """Build the weather store and coverage from the old per-team CSV files."""
+    frames, ranges = [], []
+    for team in STADIUM_COORDS:
+        path = os.path.join(cache_dir, f"{team}_weather.csv")
+        if not os.path.exists(path):
+            continue
+        weather = pd.read_csv(path, parse_dates=["date"]).assign(station=station_id(team))
+        frames.append(weather)
+        ranges.append({"station": station_id(team), "start": weather["date"].min(), "end": weather["date"].max()})
+
+    store = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["station", "date"] + WEATHER_COLUMNS)
+    coverage = pd.DataFrame(ranges, columns=["station", "start", "end"])
+    return store, coverage
+
+
+def load_weather_store(store_path=WEATHER_STORE_PATH, coverage_path=COVERAGE_PATH):
+    """Read the weather store and its coverage table (importing the legacy CSV cache if there is no store yet)."""
+    if os.path.exists(store_path) and os.path.exists(coverage_path):
+        return pd.read_parquet(store_path), pd.read_parquet(coverage_path)
+    return _import_legacy_cache()
+
+
+def save_weather_store(store, coverage, store_path=WEATHER_STORE_PATH, coverage_path=COVERAGE_PATH):
+    store = (
+        store.drop_duplicates(["station", "date"], keep="last")
+        .sort_values(["station", "date"])
+        [["station", "date"] + WEATHER_COLUMNS]
+        .reset_index(drop=True)
+    )
+    store.to_parquet(store_path, index=False)
+    _merge_ranges(coverage).to_parquet(coverage_path, index=False)
+
+
+def update_weather_store(date_ranges: pd.DataFrame, fetch=fetch_meteostat,
+                         store_path=WEATHER_STORE_PATH, coverage_path=COVERAGE_PATH):
+    """
+    Make sure the weather store covers the requested dates, fetching only what is missing.
+
+    Parameters
+    ----------
+    date_ranges : pd.DataFrame
+        Columns station, start, end: the days needed per station.
+    fetch : callable
+        fetch(lat, lon, start, end) -> DataFrame(date, temperature, precipitation, wind_speed).
+        Defaults to Meteostat; tests can pass a local stand-in.
+
+    Returns
+    -------
+    pd.DataFrame
+        The full weather store (station, date, weather columns).
+    """
+    store, coverage = load_weather_store(store_path, coverage_path)
+    stations = {station_id(team): STADIUM_COORDS[team] for team in STADIUM_COORDS}
+
+    fetched, fetched_ranges = [], []
+    for _, need in date_ranges.iterrows():
+        coords = stations[need["station"]]
+        for start, end in _missing_ranges(need["station"], need["start"], need["end"], coverage):
+            print(f"Fetching weather for station {need['station']} from {start:%Y-%m-%d} to {end:%Y-%m-%d}...")
+            weather = fetch(coords["lat"], coords["lon"], start, end)
+            weather = weather.assign(station=need["station"], date=pd.to_datetime(weather["date"]))
+            fetched.append(weather)
+            # only mark days as covered up to the last day the source actually had data for
+            available = weather.dropna(subset=WEATHER_COLUMNS, how="all")["date"]
+            if not available.empty:
+                fetched_ranges.append({"station": need["station"], "start": start, "end": min(end, available.max())})
+
+    if fetched or not (os.path.exists(store_path) and os.path.exists(coverage_path)):
+        store = pd.concat([store] + fetched, ignore_index=True)
+        coverage = pd.concat([coverage, pd.DataFrame(fetched_ranges, columns=["station", "start", "end"])], ignore_index=True)
+        save_weather_store(store, coverage, store_path, coverage_path)
+        store = pd.read_parquet(store_path)
+
+    return store
+
+
+def create_weather_features(team_games, fetch=fetch_meteostat,
+                            store_path=WEATHER_STORE_PATH, coverage_path=COVERAGE_PATH):
     """
     Add weather features to team_games DataFrame.
-    Uses Meteostat daily weather data and caches downloads.
+    Uses Meteostat daily weather data, kept in a single parquet store keyed by
+    (station, date) that only fetches date ranges it has not covered yet.
     Flags dome teams and sets neutral weather for indoor games.
 
+    Weather for every outdoor stadium is joined onto all home games with a single merge.
+
     Parameters:
         team_games (DataFrame): team-game level data
-        cache_dir (str): folder to cache weather CSVs
+        fetch (callable): weather source, see `update_weather_store`
+        store_path (str): weather store parquet file
+        coverage_path (str): per-station fetched date ranges
 
     Returns:
         DataFrame: team_games with home_weather features added
     """
-    os.makedirs(cache_dir, exist_ok=True)
-
     team_games['date'] = pd.to_datetime(team_games['date'], errors="raise")
 
-    # NFL stadium coordinates (home team -> lat/lon)
-    stadium_coords = {
-        "ARI": {"lat": 33.5275, "lon": -112.2625},
-        "ATL": {"lat": 33.755, "lon": -84.4008},
-        "BAL": {"lat": 39.2779, "lon": -76.6227},
-        "BUF": {"lat": 42.7738, "lon": -78.7865},
-        "CAR": {"lat": 35.2251, "lon": -80.8529},
-        "CHI": {"lat": 41.8623, "lon": -87.6167},
-        "CIN": {"lat": 39.0955, "lon": -84.5161},
-        "CLE": {"lat": 41.5061, "lon": -81.6995},
-        "DAL": {"lat": 32.7473, "lon": -97.0945},
-        "DEN": {"lat": 39.7439, "lon": -105.0201},
-        "DET": {"lat": 42.3400, "lon": -83.0456},
-        "GB": {"lat": 44.5013, "lon": -88.0622},
-        "HOU": {"lat": 29.6847, "lon": -95.4107},
-        "IND": {"lat": 39.7640, "lon": -86.1639},
-        "JAX": {"lat": 30.3240, "lon": -81.6375},
-        "KC": {"lat": 39.0489, "lon": -94.4839},
-        "LV": {"lat": 36.0908, "lon": -115.1830},
-        "LAC": {"lat": 33.9535, "lon": -118.3392},
-        "LA": {"lat": 34.0141, "lon": -118.2872},
-        "MIA": {"lat": 25.9580, "lon": -80.2389},
-        "MIN": {"lat": 44.9733, "lon": -93.2572},
-        "NE": {"lat": 42.0909, "lon": -71.2643},
-        "NO": {"lat": 29.9511, "lon": -90.0812},
-        "NYG": {"lat": 40.8135, "lon": -74.0744},
-        "NYJ": {"lat": 40.8135, "lon": -74.0744},  # Shares MetLife Stadium
-        "PHI": {"lat": 39.9008, "lon": -75.1675},
-        "PIT": {"lat": 40.4469, "lon": -80.0158},
-        "SEA": {"lat": 47.5952, "lon": -122.3316},
-        "SF": {"lat": 37.4030, "lon": -121.9700},
-        "TB": {"lat": 27.9759, "lon": -82.5033},
-        "TEN": {"lat": 36.1662, "lon": -86.7713},
-        "WAS": {"lat": 38.9076, "lon": -77.0209}
-    }
-
-    # Dome teams
-    dome_teams = {
-        "Cardinals", "Falcons", "Cowboys", "Lions", "Texans",
-        "Colts", "Raiders", "Chargers", "Rams", "Vikings", "Saints"
-    }
-
-    # Initialize weather columns
-    for col in ["temperature", "precipitation", "wind_speed"]:
-        team_games[f"home_{col}"] = None
-
-    # Loop over each home team
-    for team, coords in stadium_coords.items():
-        lat = float(coords['lat'])
-        lon = float(coords['lon'])
-        
-        # Filter games for this team
-        team_mask = (team_games["team"] == team) & (team_games["is_home"] == 1)
-        team_games_subset = team_games.loc[team_mask]
-
-        # Skip dome teams (set neutral weather)
-        if team in dome_teams:
-            team_games.loc[team_mask, "home_temperature"] = 70
-            team_games.loc[team_mask, "home_precipitation"] = 0
-            team_games.loc[team_mask, "home_wind_speed"] = 0
-            continue
+    is_home = team_games["is_home"] == 1
+    is_dome = is_home & team_games["team"].isin(DOME_TEAMS)
+    is_outdoor = is_home & ~is_dome & team_games["team"].isin(STADIUM_COORDS.keys())
+    outdoor = team_games.loc[is_outdoor, ["team", "date"]].assign(row=np.flatnonzero(is_outdoor))
+    outdoor["station"] = outdoor["team"].map({team: station_id(team) for team in STADIUM_COORDS})
+
+    # Days needed per station, then one columnar read of the (updated) store
+    date_ranges = outdoor.groupby("station")["date"].agg(start="min", end="max").reset_index()
+    weather = update_weather_store(date_ranges, fetch, store_path, coverage_path)
+    weather["date"] = pd.to_datetime(weather["date"]).astype(team_games["date"].dtype)
+
+    # One merge for all outdoor home games; the row column puts values back on the right rows
+    joined = outdoor.merge(weather, on=["station", "date"], how="left")
+
+    for col in WEATHER_COLUMNS:
+        values = np.full(len(team_games), np.nan)
+        values[is_dome.to_numpy()] = DOME_WEATHER[col]
+        values[joined["row"].to_numpy()] = joined[col].to_numpy(dtype=float)
+        team_games[f"home_{col}"] = values
 
-        # Cache filename
-        cache_file = os.path.join(cache_dir, f"{team}_weather.csv")
-
-        if os.path.exists(cache_file):
-            weather = pd.read_csv(cache_file, parse_dates=["date"])
-        else:
-            # Build Meteostat Point
-            point = Point(float(lat), float(lon))
-
-            start = team_games_subset['date'].min()
-            end = team_games_subset['date'].max()
-
-            # Download daily weather
-            weather = Daily(point, start, end).fetch().reset_index()
-            weather = weather[["time", "tavg", "prcp", "wspd"]]
-            weather.columns = ["date", "temperature", "precipitation", "wind_speed"]
-
-            # Cache
-            weather.to_csv(cache_file, index=False)
-
-        weather['date'] = pd.to_datetime(weather['date'])
-        
-        # Merge onto games
-        team_games.loc[team_mask, ["home_temperature", "home_precipitation", "home_wind_speed"]] = \
-            pd.merge(team_games_subset, weather, left_on="date", right_on="date", how="left")[
-                ["temperature", "precipitation", "wind_speed"]
-            ].values
-        
     print("Weather features created.")
 
     return team_games
@@ -1,10 +1,27 @@
 import os
 import pandas as pd
 import requests
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from pytz import timezone as tz
+from urllib3.util.retry import Retry
 
-WEATHER_PATH = "data/nfl_weather_forecasts.csv"
+from src.cache import CACHE_DIR, conditional_get, is_expired, read_table, write_table
+from src.weather import DOME_TEAMS
+
+FORECAST_CACHE_PATH = os.path.join(CACHE_DIR, "forecasts.parquet")
+
+# Forecasts are re-fetched per stadium once their cached copy is older than this
+FORECAST_TTL = pd.Timedelta(hours=3)
+
+FORECAST_URL = "http://api.openweathermap.org/data/2.5/forecast"
+
+# Concurrency and resilience settings for forecast requests
+MAX_WORKERS = 8
+TIMEOUT = 10  # seconds, per request
+RETRIES = 3
+BACKOFF_FACTOR = 0.5  # sleeps 0.5s, 1s, 2s between retries
 
 # Mapping full team names -> 3-letter abbreviations
 TEAM_ABBREV = {
@@ -57,81 +74,212 @@ TEAM_COORDS = {
     "Washington Commanders": {"lat": 38.9076, "lon": -77.0209}
 }
 
-# Dome teams
-dome_teams = {
-    "Arizona Cardinals", "Atlanta Falcons", "Dallas Cowboys", "Detroit Lions", "Houston Texans",
-    "Indianapolis Colts", "Oakland Raiders", "Los Angeles Chargers", "Los Angeles Rams", "Minnesota Vikings", "New Orleans Saints"
-}
+# Dome teams (full names), from the team codes used for historical weather so training and serving agree
+dome_teams = {name for name, code in TEAM_ABBREV.items() if code in DOME_TEAMS}
 
-def fetch_game_weather(home_team, kickoff_time, api_key):
-    """Fetch weather for a single game or return dome defaults."""
-    if home_team in dome_teams:
-        return {
-            "home_team": home_team,
-            "kickoff_time": kickoff_time,
-            "temperature_F": 70,
-            "wind_speed_mph": 0,
-            "weather_status": "indoor/dome",
-        }
+def make_session(pool_size=MAX_WORKERS, retries=RETRIES, backoff_factor=BACKOFF_FACTOR):
+    """HTTP session with a connection pool sized for the worker threads and retry/backoff on transient errors."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-    coords = TEAM_COORDS.get(home_team)
-    if not coords:
-        print(f"[WARN] No coordinates for {home_team}, skipping.")
-        return None
 
+def fetch_stadium_forecast(session, lat, lon, api_key, url=FORECAST_URL, timeout=TIMEOUT, etag=None, last_modified=None):
+    """
+    Fetch the 5-day / 3-hour forecast for one stadium as a conditional request.
+
+    Returns (entries, etag, last_modified), with entries None if the forecast is not
+    modified since the given validators, or None altogether if the request fails.
+    """
     try:
-        url = (
-            f"http://api.openweathermap.org/data/2.5/forecast"
-            f"?lat={coords['lat']}&lon={coords['lon']}&appid={api_key}&units=imperial"
+        data, etag, last_modified = conditional_get(
+            session,
+            url,
+            params={"lat": lat, "lon": lon, "appid": api_key, "units": "imperial"},
+            etag=etag,
+            last_modified=last_modified,
+            timeout=timeout,
         )
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        forecasts = data["list"]
-
-        closest = min(
-            forecasts,
-            key=lambda f: abs(datetime.fromtimestamp(f["dt"], tz=timezone.utc) - kickoff_time)
+        return (data["list"] if data is not None else None), etag, last_modified
+    except Exception as e:
+        print(f"[ERROR] Weather fetch failed for stadium at ({lat}, {lon}): {e}")
+        return None
+
+
+def fetch_forecasts(coords, api_key, url=FORECAST_URL, max_workers=MAX_WORKERS, timeout=TIMEOUT, validators=None):
+    """
+    Fetch forecasts for many stadiums concurrently through one pooled session.
+
+    Parameters
+    ----------
+    coords : iterable of (lat, lon)
+        Stadium coordinates; duplicates are fetched once.
+    api_key : str
+        OpenWeatherMap API key.
+    url : str
+        Forecast endpoint (overridable, e.g. to point at a local stub server).
+    max_workers : int
+        Maximum number of requests in flight.
+    timeout : float
+        Per-request timeout in seconds.
+    validators : dict, optional
+        (lat, lon) -> (etag, last_modified) from earlier responses, for conditional requests.
+
+    Returns
+    -------
+    dict
+        (lat, lon) -> result of `fetch_stadium_forecast`.
+    """
+    coords = list(dict.fromkeys(coords))
+    if not coords:
+        return {}
+    validators = validators or {}
+
+    def fetch(c):
+        etag, last_modified = validators.get(c, (None, None))
+        return fetch_stadium_forecast(
+            session, c[0], c[1], api_key, url=url, timeout=timeout, etag=etag, last_modified=last_modified
         )
 
-        return {
-            "home_team": home_team,
-            "kickoff_time": kickoff_time,
-            "temperature_F": closest["main"]["temp"],
-            "wind_speed_mph": closest["wind"].get("speed"),
-            "weather_status": closest["weather"][0]["description"],
+    with make_session(pool_size=max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(coords, pool.map(fetch, coords)))
+
+
+def _forecast_rows(lat, lon, entries, fetched_at, etag, last_modified):
+    """Flatten one stadium's forecast entries into cache rows."""
+    return pd.DataFrame({
+        "lat": lat,
+        "lon": lon,
+        "forecast_time": pd.to_datetime([f["dt"] for f in entries], unit="s", utc=True),
+        "temperature_F": [f["main"]["temp"] for f in entries],
+        "wind_speed_mph": [f["wind"].get("speed") for f in entries],
+        "weather_status": [f["weather"][0]["description"] for f in entries],
+        "fetched_at": fetched_at,
+        "etag": etag,
+        "last_modified": last_modified,
+    })
+
+
+def refresh_forecast_cache(coords, api_key, cache_path=FORECAST_CACHE_PATH, url=FORECAST_URL, now=None) -> pd.DataFrame:
+    """
+    Bring the stadium forecast cache up to date for the given stadiums.
+
+    Only stadiums that are missing or older than FORECAST_TTL are fetched; a 304 response
+    just renews the cached entries. Stadiums whose fetch fails keep their previous entries.
+    """
+    now = now if now is not None else pd.Timestamp.now(tz="UTC")
+    cache = read_table(cache_path)
+    coords = list(dict.fromkeys(coords))
+
+    fresh = set()
+    validators = {}
+    if not cache.empty:
+        stations = cache.groupby(["lat", "lon"]).agg(
+            fetched_at=("fetched_at", "max"), etag=("etag", "last"), last_modified=("last_modified", "last")
+        )
+        fresh = set(stations.index[~is_expired(stations["fetched_at"], FORECAST_TTL, now)])
+        validators = {
+            c: (row.etag, row.last_modified) for c, row in stations.iterrows()
         }
 
-    except Exception as e:
-        print(f"[ERROR] Weather fetch failed for {home_team} at {kickoff_time}: {e}")
-        return None
+    stale = [c for c in coords if c not in fresh]
+    if not stale:
+        print(f"Reading cached weather forecast for upcoming games from {cache_path}...")
+        return cache
+
+    print(f"Fetching weather forecasts for {len(stale)} stadiums...")
+    results = fetch_forecasts(stale, api_key, url=url, validators=validators)
+
+    keep = cache
+    updated = []
+    for (lat, lon), result in results.items():
+        if result is None:
+            continue
+        entries, etag, last_modified = result
+        in_station = (keep["lat"] == lat) & (keep["lon"] == lon) if not keep.empty else None
+        if entries is None:
+            keep.loc[in_station, "fetched_at"] = now
+            continue
+        if in_station is not None:
+            keep = keep[~in_station]
+        updated.append(_forecast_rows(lat, lon, entries, now, etag, last_modified))
+
+    cache = pd.concat([keep] + updated, ignore_index=True) if updated else keep
+    write_table(cache_path, cache)
+    return cache
+
 
-def get_forecasted_weather(upcoming_team_games: pd.DataFrame) -> pd.DataFrame:
-    """Fetch weather forecasts for all upcoming games sequentially."""
+def get_forecasted_weather(upcoming_team_games: pd.DataFrame, url=FORECAST_URL, now=None) -> pd.DataFrame:
+    """
+    Weather forecasts for all upcoming games.
+
+    Each outdoor stadium's forecast comes from the TTL cache (see `refresh_forecast_cache`),
+    fetched concurrently and at most once per stadium, and every kickoff is matched to the
+    forecast entry nearest to it. Dome games get neutral weather.
+
+    Parameters
+    ----------
+    upcoming_team_games : pd.DataFrame
+        Upcoming games from `get_totals` (full team names, naive US/Eastern commence_time).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per game: home_team (abbreviation), kickoff_time (same naive Eastern
+        timestamp as commence_time, for joining), temperature_F, wind_speed_mph, weather_status.
+    """
     load_dotenv()
     api_key = os.getenv("API_KEY_WEATHER")
     if not api_key:
         raise ValueError("Missing API_KEY_WEATHER in .env file")
-    
-    if os.path.exists(WEATHER_PATH):
-        print(f"Reading cached weather forecast for upcoming games from {WEATHER_PATH}...")
-        df = pd.read_csv(WEATHER_PATH, parse_dates=['kickoff_time'])
-        df['home_team'] = df['home_team'].map(TEAM_ABBREV)
-        return df
-
-    upcoming_team_games = upcoming_team_games.copy()
-    upcoming_team_games['kickoff_time'] = pd.to_datetime(upcoming_team_games['commence_time'], utc=True)
-
-    weather_data = []
-    for _, row in upcoming_team_games.iterrows():
-        result = fetch_game_weather(row['home_team'], row['kickoff_time'], api_key)
-        if result:
-            weather_data.append(result)
-
-    df = pd.DataFrame(weather_data)
-    df['home_team'] = df['home_team'].map(TEAM_ABBREV)
-
-    df.to_csv(WEATHER_PATH, index=False)
-    print(f"Saved weather forecast for upcoming games to {WEATHER_PATH}")
+
+    games = upcoming_team_games[["home_team", "commence_time"]].copy()
+    games["kickoff_time"] = pd.to_datetime(games["commence_time"])
+    if games["kickoff_time"].dt.tz is None:
+        games["kickoff_utc"] = games["kickoff_time"].dt.tz_localize(tz("US/Eastern")).dt.tz_convert("UTC")
+    else:
+        games["kickoff_utc"] = games["kickoff_time"].dt.tz_convert("UTC")
+        games["kickoff_time"] = games["kickoff_time"].dt.tz_convert(tz("US/Eastern")).dt.tz_localize(None)
+
+    is_dome = games["home_team"].isin(dome_teams)
+    has_coords = games["home_team"].isin(TEAM_COORDS.keys())
+    for team in games.loc[~has_coords, "home_team"].unique():
+        print(f"[WARN] No coordinates for {team}, skipping.")
+
+    outdoor = games[~is_dome & has_coords].copy()
+    outdoor["lat"] = outdoor["home_team"].map(lambda t: TEAM_COORDS[t]["lat"])
+    outdoor["lon"] = outdoor["home_team"].map(lambda t: TEAM_COORDS[t]["lon"])
+
+    cache = refresh_forecast_cache(list(zip(outdoor["lat"], outdoor["lon"])), api_key, url=url, now=now)
+
+    # nearest forecast entry per kickoff, within each stadium
+    if not outdoor.empty and not cache.empty:
+        outdoor["kickoff_utc"] = outdoor["kickoff_utc"].astype("datetime64[ns, UTC]")
+        forecasts = cache[["lat", "lon", "forecast_time", "temperature_F", "wind_speed_mph", "weather_status"]].copy()
+        forecasts["forecast_time"] = forecasts["forecast_time"].astype("datetime64[ns, UTC]")
+        outdoor = pd.merge_asof(
+            outdoor.sort_values("kickoff_utc"),
+            forecasts.sort_values("forecast_time"),
+            left_on="kickoff_utc",
+            right_on="forecast_time",
+            by=["lat", "lon"],
+            direction="nearest",
+        ).dropna(subset=["forecast_time"])
+    else:
+        outdoor = outdoor.iloc[0:0].assign(temperature_F=[], wind_speed_mph=[], weather_status=[])
+
+    dome = games[is_dome].assign(temperature_F=70.0, wind_speed_mph=0.0, weather_status="indoor/dome")
+
+    columns = ["home_team", "kickoff_time", "temperature_F", "wind_speed_mph", "weather_status"]
+    df = pd.concat([dome[columns], outdoor[columns]]).sort_values("kickoff_time", kind="stable").reset_index(drop=True)
+    df["home_team"] = df["home_team"].map(TEAM_ABBREV)
 
     return df
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import the pipeline as `src.*`, like main.py run from the repo root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# src.totals reads the odds API key at import; tests never call the real API
+os.environ.setdefault("API_KEY_TOTALS", "test")
@@ -0,0 +1,63 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.weather
+from benchmarks.synthetic import write_dataset
+from src.features import build_team_games
+from src.incremental import update_team_games
+from src.load import season_partition
+
+
+def fixed_weather(lat, lon, start, end):
+    """Offline stand-in for src.weather.fetch_meteostat."""
+    dates = pd.date_range(start, end, freq="D")
+    return pd.DataFrame({"date": dates, "temperature": 15.0, "precipitation": 0.0, "wind_speed": 10.0})
+
+
+@pytest.fixture
+def mid_season(tmp_path, monkeypatch):
+    """A synthetic data directory whose last season is only played through week 15."""
+    monkeypatch.chdir(tmp_path)
+    # build_team_games calls create_weather_features without a fetch, so swap the default one
+    defaults = (fixed_weather, *src.weather.create_weather_features.__defaults__[1:])
+    monkeypatch.setattr(src.weather.create_weather_features, "__defaults__", defaults)
+
+    games, plays = write_dataset(".", n_seasons=3, n_teams=8, seed=0)
+    last_season = games["season"].max()
+    unplayed = (games["season"] == last_season) & (games["week"] >= 16)
+
+    schedule = games.copy()
+    schedule.loc[unplayed, ["home_score", "away_score", "total"]] = np.nan
+    schedule.to_parquet("data/games.parquet", index=False)
+
+    season_plays = plays[(plays["season"] == last_season) & ~plays["game_id"].isin(games.loc[unplayed, "game_id"])]
+    season_plays.drop(columns="season").to_parquet(f"{season_partition(last_season)}/part-0.parquet", index=False)
+
+    return games, plays
+
+
+def test_update_matches_full_rebuild(mid_season, tmp_path):
+    games, plays = mid_season
+    store_dir = str(tmp_path / "feature_store")
+
+    before = build_team_games(store_dir=store_dir)
+    week = games[(games["season"] == games["season"].max()) & (games["week"] == 16)]
+    assert before.loc[before["game_id"].isin(week["game_id"]), "points_for"].isna().all()
+
+    updated = update_team_games(week, plays[plays["game_id"].isin(week["game_id"])], store_dir=store_dir)
+
+    shutil.rmtree(store_dir)
+    rebuilt = build_team_games(store_dir=store_dir)
+
+    assert updated.loc[updated["game_id"].isin(week["game_id"]), "points_for"].notna().all()
+    order = ["team", "season", "week"]
+    pd.testing.assert_frame_equal(
+        updated.sort_values(order).reset_index(drop=True)[rebuilt.columns],
+        rebuilt.sort_values(order).reset_index(drop=True),
+        check_dtype=False,
+        check_categorical=False,
+        atol=1e-5,
+    )
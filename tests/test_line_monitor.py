@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+import src.line_monitor
+from src.line_monitor import (
+    append_line_history, latest_snapshot, monitor_lines, normalize_snapshot, poll_once, read_line_history,
+)
+from src.model import FEATURES
+from src.scoring import ROLLING_FEATURES
+
+KICKOFFS = {"Kansas City Chiefs": "2025-09-14T17:00:00Z", "Denver Broncos": "2025-09-14T20:25:00Z"}
+AWAY = {"Kansas City Chiefs": "Buffalo Bills", "Denver Broncos": "Las Vegas Raiders"}
+POLLED_AT = pd.Timestamp("2025-09-12 12:00", tz="UTC")
+
+
+def totals(lines):
+    """An odds API totals frame with one book's line per home team."""
+    return pd.DataFrame({
+        "home_team": list(lines),
+        "away_team": [AWAY[home] for home in lines],
+        "commence_time": [KICKOFFS[home] for home in lines],
+        "total_line": list(lines.values()),
+        "bookmaker": "draftkings",
+    })
+
+
+class ScriptedFetch:
+    """Stand-in for get_totals_from_api answering each poll from a script; scripted exceptions are raised."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.validators = []
+
+    def __call__(self, api_key, etag=None, last_modified=None):
+        self.validators.append((etag, last_modified))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def fixed_weather(games):
+    """Stand-in for get_forecasted_weather: mild and calm at every kickoff."""
+    return pd.DataFrame({
+        "home_team": games["home_team"].map({"Kansas City Chiefs": "KC", "Denver Broncos": "DEN"}),
+        "kickoff_time": games["commence_time"],
+        "temperature_F": 65.0,
+        "wind_speed_mph": 5.0,
+    })
+
+
+class FixedState:
+    """Stand-in for PredictionState holding a tiny forest and a team state in memory."""
+
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.normal(20, 5, (200, len(FEATURES))), columns=FEATURES)
+        self.model = RandomForestRegressor(n_estimators=3, max_depth=4, random_state=0).fit(X, X.sum(axis=1))
+        teams = ["KC", "BUF", "DEN", "LV"]
+        self.team_state = pd.DataFrame({col: 21.0 for col in ROLLING_FEATURES}, index=pd.Index(teams, name="team"))
+
+    def refresh(self):
+        pass
+
+
+@pytest.fixture
+def history_dir(tmp_path):
+    """A line history holding one earlier snapshot of both games."""
+    path = str(tmp_path / "line_history")
+    append_line_history(normalize_snapshot(totals({"Kansas City Chiefs": 47.5, "Denver Broncos": 41.0}), POLLED_AT), path)
+    return path
+
+
+def test_poll_once_keeps_previous_snapshot(history_dir):
+    previous = latest_snapshot(history_dir)
+    kept = previous.copy()
+    fetch = ScriptedFetch(TimeoutError("odds API timed out"), (None, '"v1"', None))
+
+    with pytest.raises(TimeoutError):
+        poll_once(previous, FixedState(), "key", fetch=fetch, weather=fixed_weather, history_dir=history_dir)
+    pd.testing.assert_frame_equal(previous, kept)
+    assert len(read_line_history(history_dir)) == 2
+
+    snapshot, rescored, validators = poll_once(
+        previous, FixedState(), "key", fetch=fetch, weather=fixed_weather, history_dir=history_dir
+    )
+    assert snapshot is previous
+    assert rescored.empty
+    assert validators == ('"v1"', None)
+
+
+def test_monitor_rescores_only_moved_games_after_failure(history_dir, monkeypatch):
+    fetch = ScriptedFetch(
+        TimeoutError("odds API timed out"),
+        (None, '"v1"', None),
+        (totals({"Kansas City Chiefs": 49.0, "Denver Broncos": 41.0}), '"v2"', None),
+    )
+    defaults = list(poll_once.__defaults__)
+    defaults[2:4] = [fetch, fixed_weather]
+    monkeypatch.setattr(poll_once, "__defaults__", tuple(defaults))
+    monkeypatch.setattr(src.line_monitor, "PredictionState", FixedState)
+    sleeps = []
+    monkeypatch.setattr(src.line_monitor.time, "sleep", sleeps.append)
+
+    changes = []
+    monitor_lines(poll_seconds=10, on_change=changes.append, history_dir=history_dir, max_polls=3)
+
+    # the failed poll backs off; the 304's validators are sent with the next poll
+    assert sleeps == [20, 10]
+    assert fetch.validators == [(None, None), (None, None), ('"v1"', None)]
+    # diffed against the stored snapshot, not lost with the failed poll: only KC moved
+    assert len(changes) == 1
+    moved = changes[0]
+    assert moved[["home_team", "previous_line", "total_line"]].values.tolist() == [["KC", 47.5, 49.0]]
+    assert moved["predicted_total"].notna().all()
@@ -0,0 +1,64 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.odds import ODDS_COLUMNS, best_lines, consensus_lines, normalize_odds, read_payloads
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "odds_totals.json")
+
+# Games in the recorded payload: three books with totals, one book with totals (the other
+# only has moneylines), and a game no book has priced yet
+CHIEFS = "a1f0c7e2b9d84f3c8e6a5b4c3d2e1f00"
+BRONCOS = "b2e1d8f3c0a94e4d9f7b6c5d4e3f2a11"
+
+
+@pytest.fixture
+def odds():
+    return normalize_odds(read_payloads([FIXTURE]))
+
+
+def test_normalize_odds_keeps_every_book_and_side(odds):
+    assert list(odds.columns) == ODDS_COLUMNS
+    assert len(odds) == 8
+    chiefs = odds[odds["event_id"] == CHIEFS]
+    assert sorted(chiefs["bookmaker"].astype(str).unique()) == ["BetMGM", "DraftKings", "FanDuel"]
+    assert chiefs.groupby("bookmaker", observed=True)["side"].nunique().eq(2).all()
+    fanduel_under = chiefs[(chiefs["bookmaker"] == "FanDuel") & (chiefs["side"] == "Under")].iloc[0]
+    assert (fanduel_under["point"], fanduel_under["price"]) == (47.5, -115)
+    assert odds["fetched_at"].iloc[0] == pd.Timestamp("2025-09-12 15:00", tz="UTC")
+    assert odds["commence_time"].dt.tz is not None
+
+
+def test_normalize_odds_skips_missing_markets(odds):
+    # the moneyline-only book and the unpriced game contribute no rows
+    broncos = odds[odds["event_id"] == BRONCOS]
+    assert broncos["bookmaker"].astype(str).unique().tolist() == ["FanDuel"]
+    assert "Philadelphia Eagles" not in set(odds["home_team"].astype(str))
+
+    with open(FIXTURE) as f:
+        data = json.load(f)["data"]
+    assert normalize_odds([(None, data)], market="spreads").empty
+    empty = normalize_odds([(None, [data[2]])])
+    assert empty.empty and list(empty.columns) == ODDS_COLUMNS
+
+
+def test_consensus_lines(odds):
+    consensus = consensus_lines(odds).set_index("event_id")
+    assert consensus.loc[CHIEFS, "consensus_line"] == 47.5
+    assert consensus.loc[CHIEFS, "books"] == 3
+    assert consensus.loc[CHIEFS, ["over_price", "under_price"]].tolist() == [-110, -110]
+    assert consensus.loc[CHIEFS, "no_vig_p_over"] == pytest.approx(0.5)
+    assert consensus.loc[BRONCOS, "books"] == 1
+    assert consensus.loc[BRONCOS, "consensus_line"] == 41.0
+
+
+def test_best_lines(odds):
+    best = best_lines(odds).set_index(["event_id", "side"])
+    # the over is best at the lowest total (ties broken by price), the under at the highest
+    over = best.loc[(CHIEFS, "Over")]
+    assert (over["bookmaker"], over["point"], over["price"]) == ("FanDuel", 47.5, -105)
+    under = best.loc[(CHIEFS, "Under")]
+    assert (under["bookmaker"], under["point"], under["price"]) == ("BetMGM", 48.5, -105)
+    assert len(best) == 4
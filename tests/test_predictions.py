@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import src.predictions
+from src.predictions import (
+    closing_line_value, game_history, import_legacy_runs, load_run, read_runs, record_results, save_predictions,
+)
+
+KICKOFF = "2025-09-14 13:00:00"
+
+
+def matchup(predicted_total, total_line=47.5):
+    return pd.DataFrame({
+        "date": [KICKOFF], "home_team": ["KC"], "away_team": ["BUF"],
+        "total_line": [total_line], "predicted_total": [predicted_total],
+    })
+
+
+def final_score(home_score=28, away_score=23, closing_line=49.5):
+    return pd.DataFrame({
+        "home_team": ["KC"], "away_team": ["BUF"], "gameday": ["2025-09-14"],
+        "home_score": [home_score], "away_score": [away_score], "total_line": [closing_line],
+    })
+
+
+class FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 9, 10, 9, 30)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A store imported from three runs an older version wrote on the same day."""
+    # the _v10 run is the day's last; its id sorts before _v2 as text
+    matchup(45.0).to_csv(tmp_path / "predictions_20250910.csv", index=False)
+    matchup(40.0).to_csv(tmp_path / "predictions_20250910_v2.csv", index=False)
+    matchup(52.0).to_csv(tmp_path / "predictions_20250910_v10.csv", index=False)
+    store_path = str(tmp_path / "predictions.sqlite")
+    assert import_legacy_runs(str(tmp_path), store_path) == 3
+    return store_path
+
+
+def test_imported_runs_are_ordered_by_version(store, tmp_path):
+    assert read_runs(store)["run_id"].tolist() == ["20250910_v10", "20250910_v2", "20250910"]
+    assert game_history("KC", "BUF", store_path=store)["predicted_total"].tolist() == [45.0, 40.0, 52.0]
+    assert import_legacy_runs(str(tmp_path), store) == 0
+
+
+def test_record_results_fills_closing_line_and_total(store):
+    assert record_results(final_score(), store) == 3
+    run = load_run("20250910_v2", store)
+    assert run[["closing_line", "actual_total"]].values.tolist() == [[49.5, 51.0]]
+    # results already recorded are left alone
+    assert record_results(final_score(home_score=0), store) == 0
+
+
+def test_closing_line_value_uses_latest_run(store, monkeypatch):
+    record_results(final_score(), store)
+    # _v10 picks the over: the line closed 2 points higher and the game went over
+    clv = closing_line_value(store)
+    assert clv[["week", "picks", "clv", "wins", "losses"]].values.tolist() == [[2, 1, 2.0, 1, 0]]
+
+    # a later run under a timestamp id, which sorts before the imported ids as text
+    monkeypatch.setattr(src.predictions, "datetime", FixedDatetime)
+    rows = save_predictions(matchup(44.0), store_path=store)
+    assert rows["run_id"].iloc[0] == "20250910_093000_000000"
+    assert read_runs(store)["run_id"].iloc[0] == "20250910_093000_000000"
+
+    record_results(final_score(), store)
+    clv = closing_line_value(store)
+    assert clv[["picks", "clv", "wins", "losses"]].values.tolist() == [[1, -2.0, 0, 1]]
+    # a single run's picks are still available by id
+    assert closing_line_value(store, run_id="20250910_v10")["clv"].tolist() == [2.0]
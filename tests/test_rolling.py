@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rolling import rolling_stats
+
+
+def pandas_stat(df, by, column, stat, window, shift, min_periods):
+    """The same statistic computed the plain pandas way, one group at a time."""
+    values = df.groupby(by)[column].shift() if shift else df[column]
+    grouped = values.groupby(df[by])
+    if stat == "ewm":
+        return grouped.transform(lambda s: s.ewm(span=window, min_periods=min_periods).mean())
+    return grouped.transform(lambda s: getattr(s.rolling(window, min_periods=min_periods), stat)())
+
+
+@pytest.fixture
+def games():
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame({
+        "team": rng.choice(["KC", "BUF", "DEN", "LV"], n),
+        "points": rng.normal(22, 8, n),
+        "epa": rng.normal(0, 0.2, n),
+    })
+    df.loc[rng.random(n) < 0.15, "points"] = np.nan
+    df.loc[rng.random(n) < 0.05, "team"] = None
+    return df
+
+
+@pytest.mark.parametrize("shift", [True, False])
+@pytest.mark.parametrize("min_periods", [1, 3])
+def test_matches_pandas(games, shift, min_periods):
+    specs = {
+        f"{column}_{stat}_{window}": (column, stat, window)
+        for column in ("points", "epa")
+        for stat in ("mean", "std", "ewm")
+        for window in (3, 5)
+    }
+    result = rolling_stats(games, "team", specs, shift=shift, min_periods=min_periods)
+
+    for name, (column, stat, window) in specs.items():
+        expected = pandas_stat(games, "team", column, stat, window, shift, min_periods)
+        pd.testing.assert_series_equal(result[name], expected, check_names=False, rtol=1e-9, atol=1e-9)
+
+
+def test_ewm_of_long_groups(games):
+    # far past the length at which one set of span-5 weights leaves float range
+    rng = np.random.default_rng(1)
+    n = 20_000
+    df = pd.DataFrame({"team": np.where(np.arange(n) < 50, "BUF", "KC"), "points": rng.normal(22, 8, n)})
+    df.loc[rng.random(n) < 0.1, "points"] = np.nan
+
+    for window in (5, 40):
+        result = rolling_stats(df, "team", {"ewm": ("points", "ewm", window)})["ewm"]
+        expected = pandas_stat(df, "team", "points", "ewm", window, True, 1)
+        pd.testing.assert_series_equal(result, expected, check_names=False, rtol=1e-9, atol=1e-9)
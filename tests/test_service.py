@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+import src.service
+from src.forest import CompactForest
+from src.model import FEATURES
+from src.scoring import ROLLING_FEATURES, save_team_state
+from src.service import PredictionState, make_handler
+
+GAME = {"home_team": "KC", "away_team": "BUF", "total_line": 47.5, "home_temperature": 10.0, "home_wind_speed": 5.0}
+
+
+def write_team_state(path, points_for, mtime_ns):
+    state = pd.DataFrame({col: [points_for, 22.0] for col in ROLLING_FEATURES}, index=pd.Index(["KC", "BUF"], name="team"))
+    save_team_state(state, path)
+    # set the modification time explicitly: two writes can land on the same coarse timestamp
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(20, 5, (200, len(FEATURES))), columns=FEATURES)
+    y = X["home_rolling_avg_points_for"] + X["away_rolling_avg_points_for"]
+    model = RandomForestRegressor(n_estimators=3, max_depth=4, random_state=0).fit(X, y)
+
+    paths = {
+        "model_path": str(tmp_path / "model.joblib"),
+        "compact_path": str(tmp_path / "model.npz"),
+        "state_path": str(tmp_path / "team_state.parquet"),
+    }
+    CompactForest.from_sklearn(model).save(paths["compact_path"])
+    write_team_state(paths["state_path"], 20.0, 1_000_000_000_000_000_000)
+    return paths
+
+
+@pytest.fixture
+def service(artifacts, monkeypatch):
+    """The service on an ephemeral port; yields a request function and the team state load count."""
+    loads = []
+
+    def counting_load(path):
+        loads.append(path)
+        return pd.read_parquet(path)
+
+    monkeypatch.setattr(src.service, "load_team_state", counting_load)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(PredictionState(**artifacts)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def request(path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        url = f"http://127.0.0.1:{server.server_port}{path}"
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=10) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+
+    yield request, loads
+    server.shutdown()
+    server.server_close()
+
+
+def test_missing_fields_are_listed(service):
+    request, _ = service
+    status, body = request("/predict", {"games": [GAME, {"home_team": "KC", "away_team": "BUF", "total_line": None}]})
+    assert status == 400
+    assert body["error"] == "Missing fields (by game index): {1: ['total_line', 'home_temperature', 'home_wind_speed']}"
+
+
+def test_reloads_only_when_team_state_changes(service, artifacts):
+    request, loads = service
+    status, body = request("/predict", {"games": [GAME]})
+    assert status == 200
+    first = body["predictions"][0]["predicted_total"]
+    request("/predict", {"games": [GAME]})
+    assert request("/health")[0] == 200
+    assert len(loads) == 1
+
+    write_team_state(artifacts["state_path"], 35.0, 1_000_000_001_000_000_000)
+    status, body = request("/predict", {"games": [GAME]})
+    assert status == 200
+    assert len(loads) == 2
+    assert body["predictions"][0]["predicted_total"] != first
+
+
+def test_corrupt_artifact_is_a_server_error(service, artifacts):
+    request, _ = service
+    with open(artifacts["compact_path"], "wb") as f:
+        f.write(b"not a model")
+    write_team_state(artifacts["state_path"], 20.0, 1_000_000_001_000_000_000)
+
+    for status, body in (request("/predict", {"games": [GAME]}), request("/health")):
+        assert status == 500
+        assert set(body) == {"error"}
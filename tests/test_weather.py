@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from src.weather import WEATHER_COLUMNS, create_weather_features, station_id
+
+
+class CountingFetch:
+    """Local stand-in for src.weather.fetch_meteostat that records every (lat, lon, start, end) call."""
+
+    def __init__(self, last_available=None):
+        self.calls = []
+        self.last_available = pd.Timestamp(last_available) if last_available else None
+
+    def __call__(self, lat, lon, start, end):
+        self.calls.append((lat, lon, pd.Timestamp(start), pd.Timestamp(end)))
+        dates = pd.date_range(start, end, freq="D")
+        weather = pd.DataFrame({"date": dates, "temperature": 15.0, "precipitation": 0.0, "wind_speed": 10.0})
+        if self.last_available is not None:
+            weather.loc[weather["date"] > self.last_available, WEATHER_COLUMNS] = float("nan")
+        return weather
+
+    def ranges(self):
+        return [(start, end) for _, _, start, end in self.calls]
+
+
+def home_games(team, dates):
+    return pd.DataFrame({"team": team, "date": pd.to_datetime(dates), "is_home": 1})
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # keep the legacy CSV import (data/weather_cache) pointed at an empty directory
+    monkeypatch.chdir(tmp_path)
+    return {"store_path": str(tmp_path / "weather.parquet"), "coverage_path": str(tmp_path / "coverage.parquet")}
+
+
+def test_second_run_fetches_only_new_range(store):
+    fetch = CountingFetch()
+    create_weather_features(home_games("KC", ["2024-09-08", "2024-09-22"]), fetch, **store)
+    assert fetch.ranges() == [(pd.Timestamp("2024-09-08"), pd.Timestamp("2024-09-22"))]
+
+    fetch.calls.clear()
+    team_games = create_weather_features(home_games("KC", ["2024-09-08", "2024-09-22", "2024-10-06"]), fetch, **store)
+    assert fetch.ranges() == [(pd.Timestamp("2024-09-23"), pd.Timestamp("2024-10-06"))]
+    assert team_games["home_temperature"].tolist() == [15.0, 15.0, 15.0]
+
+    coverage = pd.read_parquet(store["coverage_path"])
+    assert coverage[["start", "end"]].values.tolist() == [[pd.Timestamp("2024-09-08"), pd.Timestamp("2024-10-06")]]
+
+
+def test_covered_ranges_are_not_refetched(store):
+    fetch = CountingFetch()
+    create_weather_features(home_games("KC", ["2024-09-08", "2024-10-06"]), fetch, **store)
+    create_weather_features(home_games("BUF", ["2024-09-15"]), fetch, **store)
+    fetch.calls.clear()
+
+    # earlier and in-between days of already covered stations; a dome team is never fetched
+    games = pd.concat([
+        home_games("KC", ["2024-09-01", "2024-09-20"]),
+        home_games("BUF", ["2024-09-15"]),
+        home_games("DET", ["2024-09-15"]),
+    ], ignore_index=True)
+    create_weather_features(games, fetch, **store)
+    assert fetch.ranges() == [(pd.Timestamp("2024-09-01"), pd.Timestamp("2024-09-07"))]
+
+    fetch.calls.clear()
+    create_weather_features(games, fetch, **store)
+    assert fetch.calls == []
+
+
+def test_days_without_data_are_refetched(store):
+    # the source has nothing after the 20th yet, so only days up to then count as covered
+    fetch = CountingFetch(last_available="2024-09-20")
+    create_weather_features(home_games("KC", ["2024-09-08", "2024-09-22"]), fetch, **store)
+
+    fetch = CountingFetch()
+    create_weather_features(home_games("KC", ["2024-09-08", "2024-09-22"]), fetch, **store)
+    assert fetch.ranges() == [(pd.Timestamp("2024-09-21"), pd.Timestamp("2024-09-22"))]
+
+    store_table = pd.read_parquet(store["store_path"])
+    kc = store_table[store_table["station"] == station_id("KC")].set_index("date")
+    assert kc.loc["2024-09-22", "temperature"] == 15.0
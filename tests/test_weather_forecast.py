@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from src.weather_forecast import fetch_forecasts
+
+
+class StubForecastServer:
+    """
+    Local stand-in for the OpenWeatherMap forecast endpoint on an ephemeral port.
+
+    Counts requests per stadium; `fail_first` stadiums answer 503 to their first request
+    and `delay` seconds are slept before every response.
+    """
+
+    def __init__(self, fail_first=(), delay=0.0):
+        self.requests = Counter()
+        self.fail_first = set(fail_first)
+        self.delay = delay
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                coords = (float(query["lat"][0]), float(query["lon"][0]))
+                with stub.lock:
+                    stub.requests[coords] += 1
+                    attempt = stub.requests[coords]
+                time.sleep(stub.delay)
+                if coords in stub.fail_first and attempt == 1:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = json.dumps({"list": [{
+                    "dt": 1757869200,
+                    "main": {"temp": 70.0},
+                    "wind": {"speed": 5.0},
+                    "weather": [{"description": "clear sky"}],
+                }]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        # clients that timed out have hung up by the time a delayed response is written
+        self.server.handle_error = lambda request, client_address: None
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/forecast"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# Two stadium coordinates shared by two teams each (e.g. the Giants and Jets)
+METLIFE = (40.8135, -74.0744)
+SOFI = (33.9535, -118.3392)
+
+
+def test_fetch_forecasts_requests_each_stadium_once():
+    with StubForecastServer() as stub:
+        results = fetch_forecasts([METLIFE, SOFI, METLIFE, SOFI], "key", url=stub.url)
+
+    assert set(results) == {METLIFE, SOFI}
+    assert stub.requests == {METLIFE: 1, SOFI: 1}
+    entries, _, _ = results[METLIFE]
+    assert entries[0]["main"]["temp"] == 70.0
+
+
+def test_fetch_forecasts_retries_server_errors():
+    with StubForecastServer(fail_first=[METLIFE]) as stub:
+        results = fetch_forecasts([METLIFE, SOFI], "key", url=stub.url)
+
+    assert stub.requests == {METLIFE: 2, SOFI: 1}
+    assert results[METLIFE] is not None
+    assert results[METLIFE][0][0]["wind"]["speed"] == 5.0
+
+
+def test_fetch_forecasts_times_out():
+    with StubForecastServer(delay=0.5) as stub:
+        start = time.perf_counter()
+        results = fetch_forecasts([METLIFE], "key", url=stub.url, timeout=0.05)
+        elapsed = time.perf_counter() - start
+
+    # a stadium that keeps timing out gives None after the retries instead of hanging
+    assert results == {METLIFE: None}
+    assert stub.requests[METLIFE] > 1
+    assert elapsed < 10